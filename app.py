@@ -1,18 +1,20 @@
+import time
+from contextlib import nullcontext
 import streamlit as st
-from utils.data_loader import load_data
-from utils.sentiment import load_model_and_vectorizer
+from utils import profiling
+from utils.data_loader import get_review_data
 from tabs import sentiment_tab, comparison_tab, attribute_tab, recommendation_tab
 import pandas as pd
 
+# Tabs share one set of frames across reruns and sessions; copy-on-write keeps
+# any column a tab adds local to that tab instead of leaking into the shared data
+pd.set_option("mode.copy_on_write", True)
+
 def main():
     st.set_page_config(page_title="EV Review Sentiment Analysis", layout="wide")
 
-    # Load datasets and models once
-    data_2w, data_4w_cw, data_4w_cd = load_data()
-    model, vectorizer = load_model_and_vectorizer()
-
-    # ✅ Correct concatenation
-    combined_data = pd.concat([data_2w, data_4w_cw, data_4w_cd], ignore_index=True)
+    # EV_PROFILE / EV_METRICS_PORT turn on Prometheus stage metrics (utils.profiling)
+    profiling.configure_from_env()
 
     # Sidebar navigation
     st.sidebar.title("Navigation")
@@ -23,16 +25,41 @@ def main():
         "Recommendations": recommendation_tab
     }
     selected_tab = st.sidebar.radio("Go to", list(tabs.keys()))
+    show_performance = st.sidebar.checkbox("Show performance", value=False)
+
+    start = time.perf_counter()
+    with profiling.record() if show_performance else nullcontext() as records, profiling.tab(selected_tab):
+        # Datasets are loaded once per process (reloaded when a data file changes);
+        # the precomputed store from `python -m utils.enrich` is used when present.
+        # The model and vectorizer are process-wide singletons in utils.sentiment,
+        # loaded on the first review that actually needs scoring.
+        data = get_review_data()
+
+        # Render the selected tab
+        if selected_tab == "Sentiment Analysis":
+            sentiment_tab.render(data)
+        elif selected_tab == "Market Comparison":
+            comparison_tab.render(data)
+        elif selected_tab == "Attribute Scores":
+            attribute_tab.render(data)
+        elif selected_tab == "Recommendations":
+            recommendation_tab.render(data)
+
+    if show_performance:
+        render_performance_panel(records, time.perf_counter() - start)
 
-    # Render the selected tab
-    if selected_tab == "Sentiment Analysis":
-        sentiment_tab.render(data_2w, data_4w_cw, data_4w_cd, model, vectorizer)
-    elif selected_tab == "Market Comparison":
-        comparison_tab.render(data_2w, data_4w_cw, data_4w_cd)
-    elif selected_tab == "Attribute Scores":
-        attribute_tab.render(data_2w, data_4w_cw, data_4w_cd)
-    elif selected_tab == "Recommendations":
-        recommendation_tab.render(data_2w, data_4w_cw, data_4w_cd)
+def render_performance_panel(records, seconds):
+    # Stage breakdown of the rerun that just finished; "other" is everything
+    # outside the instrumented stages (Streamlit, filtering, layout)
+    st.sidebar.subheader("Performance")
+    st.sidebar.metric("Rerun time", f"{seconds * 1000:.0f} ms")
+    if not records:
+        st.sidebar.caption("No instrumented stages ran (results were already cached).")
+        return
+    summary = profiling.breakdown(records)
+    other = max(seconds * 1000 - summary["Total ms"].sum(), 0.0)
+    summary.loc[len(summary)] = ["other", 0, 0, other]
+    st.sidebar.dataframe(summary.round({"Total ms": 1}), hide_index=True, use_container_width=True)
 
 if __name__ == "__main__":
     main()
@@ -1,23 +1,22 @@
 # attribute_tab.py tab3
 import streamlit as st
-import pandas as pd
-from utils.data_loader import load_data
-from utils.visualization import plot_attribute_score_analysis  # Assumed plotly version
+from utils.data_loader import ENRICHED_COLUMNS
+from utils.visualization import plot_attribute_mentions, plot_attribute_score_analysis  # Assumed plotly version
 
 
-def render(data_2w, data_4w_cw, data_4w_cd):
+def render(data):
     st.title("🔧 Attribute Score Visualization")
 
     vehicle_type = st.selectbox("Select Vehicle Type", ["2 Wheeler", "4 Wheeler"])
 
     if vehicle_type == "2 Wheeler":
-        combined = data_2w.copy()
+        combined = data.data_2w
         model_options = sorted(combined["Model_Name"].dropna().unique())
     else:
         # Combine both categories of 4 wheelers for data,
         # but only show model names from data_4w_cw in dropdown
-        combined = pd.concat([data_4w_cw, data_4w_cd], ignore_index=True)
-        model_options = sorted(data_4w_cw["Model_Name"].dropna().unique())
+        combined = data.data_4w
+        model_options = sorted(data.data_4w_cw["Model_Name"].dropna().unique())
 
     if "Model_Name" not in combined.columns or "Review" not in combined.columns:
         st.error("Model_Name or Review column missing in dataset.")
@@ -25,9 +24,9 @@ def render(data_2w, data_4w_cw, data_4w_cd):
 
     def extract_attributes(df):
         drop_cols = [
-            'Review', 'rating', 'Model_Name', 'Attributes Mentioned', 'Used it for', 'Owned for',
+            'Review', 'rating', 'Model_Name', 'Attributes Mentioned', 'Attributes', 'Used it for', 'Owned for',
             'Ridden for', 'driven', 'Condition', 'Experience', 'Extra Features', 'Maintenance cost'
-        ]
+        ] + ENRICHED_COLUMNS
         return [col for col in df.columns if col not in drop_cols]
 
     attribute_cols = extract_attributes(combined)
@@ -38,19 +37,31 @@ def render(data_2w, data_4w_cw, data_4w_cd):
 
     selected_model = st.selectbox("Select EV Model", model_options)
 
-    model_data = combined[combined["Model_Name"] == selected_model]
+    # Precomputed per-model means and counts (built once per data version)
+    index = data.model_index
+    index_key = ("2W" if vehicle_type == "2 Wheeler" else "4W", selected_model)
 
-    if model_data.empty:
+    if index_key not in index:
         st.warning("No data found for this model.")
         return
 
-    attributes_df = model_data.reindex(columns=attribute_cols).apply(pd.to_numeric, errors='coerce')
-    avg_scores = attributes_df.mean()
+    avg_scores = index.attribute_means_for(*index_key).reindex(attribute_cols)
+    model_stats = index.stats_for(*index_key)
 
-    review_count = len(model_data)
-    avg_length = model_data["Review"].astype(str).apply(len).mean()
+    review_count = int(model_stats["Review Count"])
+    avg_length = model_stats["Mean Review Length"]
 
     st.markdown(f"**Model:** `{selected_model}` | **Reviews:** `{review_count}` | **Avg. Review Length:** `{avg_length:.1f}` characters")
 
     fig = plot_attribute_score_analysis(selected_model, avg_scores, review_count, avg_length)
-    st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    st.plotly_chart(fig, use_container_width=True)
+
+    # cardekho's attribute lists, parsed once per data version (utils.mentions)
+    if vehicle_type == "4 Wheeler":
+        mentions = data.attribute_mentions
+        frequencies = mentions.frequencies_for(selected_model)
+        if frequencies.empty:
+            st.info("No attribute mentions recorded for this model.")
+        else:
+            fig = plot_attribute_mentions(selected_model, frequencies, mentions.reviews_for(selected_model))
+            st.plotly_chart(fig, use_container_width=True)
@@ -1,22 +1,20 @@
 # Comparision tab 2
 import streamlit as st
-import pandas as pd
-from utils.sentiment import predict_numerical_score
+from utils.sentiment import review_scores
 from utils.visualization import plot_sentiment_comparison_bar
 
-def render(data_2w, data_4w_cw, data_4w_cd):
+def render(data):
     st.title("🔍 EV Model Comparison")
 
     # Step 1: Select vehicle category
     category = st.radio("Select Vehicle Type", ["2 Wheeler", "4 Wheeler"])
 
-    if category == "2 Wheeler":
-        comparison_data = data_2w.copy()
-    else:
-        comparison_data = pd.concat([data_4w_cw, data_4w_cd], ignore_index=True)
-
-    comparison_data.dropna(subset=["Review", "Model_Name"], inplace=True)
-    all_models = sorted(comparison_data["Model_Name"].unique())
+    vehicle_key = "2W" if category == "2 Wheeler" else "4W"
+    index = data.model_index
+    all_models = [
+        model for model in index.models(vehicle_key)
+        if index.stats_for(vehicle_key, model)["Text Reviews"] > 0
+    ]
 
     # Step 2: Select models to compare
     selected_models = st.multiselect("Select two or more models to compare", all_models)
@@ -24,12 +22,18 @@ def render(data_2w, data_4w_cw, data_4w_cd):
     if len(selected_models) >= 2:
         st.subheader("🔍 Sentiment Score Comparison")
 
-        # Step 3: Compute average sentiment scores
-        sentiment_scores = {
-            model: comparison_data[comparison_data["Model_Name"] == model]["Review"]
-                    .apply(predict_numerical_score).mean()
-            for model in selected_models
-        }
+        # Step 3: Average sentiment scores, precomputed when the data is enriched;
+        # otherwise score the selected models' reviews in one batch
+        if index.has_sentiment:
+            sentiment_scores = {
+                model: index.stats_for(vehicle_key, model)["Mean Predicted Score"]
+                for model in selected_models
+            }
+        else:
+            comparison_data = data.by_vehicle_type(vehicle_key).dropna(subset=["Review", "Model_Name"])
+            selected_data = comparison_data[comparison_data["Model_Name"].isin(selected_models)]
+            model_means = review_scores(selected_data).groupby(selected_data["Model_Name"], observed=True).mean()
+            sentiment_scores = {model: model_means[model] for model in selected_models}
 
         # Step 4: Plot the comparison
         fig_sentiment = plot_sentiment_comparison_bar(sentiment_scores)
@@ -1,35 +1,25 @@
 # Tab1 - Sentiment Analysis Tab1
 # This tab handles sentiment analysis of EV reviews, including visualizations and interactions.
 import streamlit as st
-import pandas as pd
 import numpy as np
-from utils.data_loader import load_data
-from utils.sentiment import predict_sentiment_label, sentiment_breakdown
+from utils.sentiment import label_reviews, model_fingerprint
+from utils.wordfreq import token_counts, word_frequencies
 from utils.visualization import (
+    cached_wordcloud,
     plot_sentiment_pie,
     plot_wordcloud,
     plot_sentiment_bar,
-    plot_sentiment_scatter
+    plot_sentiment_scatter,
+    review_lengths,
+    truncate_text,
+    SCATTER_POINT_BUDGET,
 )
 
-def render(data_2w, data_4w_cw, data_4w_cd, model, vectorizer):
+def render(data):
     st.title("📊 Sentiment Analysis of EV Reviews")
 
-    # Combine and normalize rating columns
-    def normalize_data(df, vehicle_type):
-        df = df.dropna(subset=["Review"]).copy()
-        df["Vehicle_Type"] = vehicle_type
-        if "rating" not in df.columns and "Rating" in df.columns:
-            df.rename(columns={"Rating": "rating"}, inplace=True)
-        elif "rating" not in df.columns:
-            df["rating"] = np.nan  # Default if missing
-        return df
-
-    data_2w = normalize_data(data_2w, "2-Wheeler")
-    data_4w_cw = normalize_data(data_4w_cw, "4-Wheeler")
-    data_4w_cd = normalize_data(data_4w_cd, "4-Wheeler")
-
-    all_data = pd.concat([data_2w, data_4w_cw, data_4w_cd], ignore_index=True)
+    # Combined reviews with normalized rating columns (built once, shared)
+    all_data = data.sentiment_data
 
     # Vehicle type selector
     vehicle_type = st.selectbox("Choose Vehicle Type", ["2-Wheeler", "4-Wheeler"])
@@ -40,14 +30,15 @@ def render(data_2w, data_4w_cw, data_4w_cd, model, vectorizer):
     selected_model = st.selectbox("Choose EV Model (or All)", ["All"] + sorted(filtered_by_type["Model_Name"].unique()))
 
     if selected_model != "All":
-        filtered_data = filtered_by_type[filtered_by_type["Model_Name"] == selected_model].copy()
+        filtered_data = filtered_by_type[filtered_by_type["Model_Name"] == selected_model]
     else:
-        filtered_data = filtered_by_type.copy()
+        filtered_data = filtered_by_type
 
     # Predict sentiment if missing
     if "Predicted Sentiment" not in filtered_data.columns:
         with st.spinner("Analyzing sentiment..."):
-            filtered_data["Predicted Sentiment"] = filtered_data["Review"].apply(predict_sentiment_label)
+            # Only labels are shown here, so the booster is skipped
+            filtered_data["Predicted Sentiment"] = label_reviews(filtered_data["Review"])
 
     # Sentiment filter
     st.subheader("Sentiment Distribution")
@@ -61,10 +52,25 @@ def render(data_2w, data_4w_cw, data_4w_cd, model, vectorizer):
         filtered_data = filtered_data[filtered_data["Predicted Sentiment"] == clicked_sentiment]
         st.success(f"Showing only **{clicked_sentiment}** reviews")
 
-    # Word Cloud
+    # Word Cloud, from token counts precomputed once per data version when the
+    # enriched store provides labels; otherwise counted for this selection only.
+    # A selection already rendered for this data and model is not counted again
     st.subheader("Most Frequent Words")
-    wc_fig = plot_wordcloud(filtered_data, sentiment=clicked_sentiment if clicked_sentiment != "All" else None)
-    st.pyplot(wc_fig)
+    vehicle_key = "2W" if vehicle_type == "2-Wheeler" else "4W"
+    wc_key = (data.version, model_fingerprint(), vehicle_type, selected_model, clicked_sentiment)
+    wc_image = cached_wordcloud(wc_key)
+    if wc_image is None:
+        if "Predicted Sentiment" in all_data.columns:
+            counts = data.token_counts
+        else:
+            counts = token_counts(filtered_data, vehicle_key)
+        frequencies = word_frequencies(
+            counts, vehicle_key,
+            model_name=selected_model if selected_model != "All" else None,
+            sentiment=clicked_sentiment if clicked_sentiment != "All" else None,
+        )
+        wc_image = plot_wordcloud(frequencies, key=wc_key)
+    st.image(wc_image, use_container_width=True)
 
     # Bar Chart
     st.subheader("Sentiment Count")
@@ -73,7 +79,15 @@ def render(data_2w, data_4w_cw, data_4w_cd, model, vectorizer):
 
     # Scatter Plot
     st.subheader("Review Length vs Sentiment")
-    scatter_fig = plot_sentiment_scatter(filtered_data, filtered_sentiment=clicked_sentiment if clicked_sentiment != "All" else None)
+    scatter_mode = "points"
+    if len(filtered_data) > SCATTER_POINT_BUDGET:
+        shown_as = st.radio("Show reviews as", ["Sampled points", "Density"], horizontal=True)
+        scatter_mode = "density" if shown_as == "Density" else "points"
+    scatter_fig = plot_sentiment_scatter(
+        filtered_data,
+        filtered_sentiment=clicked_sentiment if clicked_sentiment != "All" else None,
+        mode=scatter_mode,
+    )
     st.plotly_chart(scatter_fig, use_container_width=True)
 
     # Heatmap
@@ -89,9 +103,30 @@ def render(data_2w, data_4w_cw, data_4w_cd, model, vectorizer):
     st.subheader("Review Summary Stats")
     total_reviews = len(filtered_data)
     avg_rating = filtered_data["rating"].mean() if "rating" in filtered_data.columns else "N/A"
-    avg_length = filtered_data["Review"].astype(str).apply(len).mean()
+    avg_length = review_lengths(filtered_data).mean()
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Reviews", total_reviews)
-    col2.metric("Average Rating", f"{avg_rating:.2f}" if isinstance(avg_rating, float) else "N/A")
+    # float32 ratings (typed loader) give a numpy scalar, not a Python float
+    col2.metric("Average Rating", f"{avg_rating:.2f}" if isinstance(avg_rating, (float, np.floating)) else "N/A")
     col3.metric("Avg Review Length", f"{avg_length:.1f} characters")
+
+    # Similar reviews: nearest neighbours in TF-IDF space within the selected
+    # vehicle type and model (index built once per data version)
+    st.subheader("Find Similar Reviews")
+    query = st.text_input("Describe an issue or topic (e.g. 'charging problem')", "")
+    if query.strip():
+        top_k = st.slider("Number of reviews", min_value=5, max_value=50, value=10, step=5)
+        matches = data.search_index.search(
+            query, k=top_k,
+            vehicle_type=vehicle_key,
+            model_name=selected_model if selected_model != "All" else None,
+        )
+        if matches.empty:
+            st.info("No reviews share any words with that query.")
+        else:
+            matches["Review"] = truncate_text(matches["Review"], max_chars=400)
+            st.dataframe(
+                matches[["Model_Name", "Predicted Sentiment", "Rating", "Similarity", "Review"]].round({"Similarity": 3}),
+                use_container_width=True, hide_index=True,
+            )
@@ -0,0 +1,6 @@
+# conftest.py
+# Tests import the app's packages (utils, tabs) from the repository root
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,47 @@
+# test_preprocessing.py
+# Parity of the fused normalize_text with the original preprocess_text ->
+# lemmatize_text chain, which the saved vectorizer was fitted on. Needs the NLTK
+# corpora locally (nothing is downloaded); skipped otherwise.
+import pandas as pd
+import pytest
+from utils.data_loader import SOURCE_FILES
+from utils.preprocessing import lemmatize_text, missing_nltk_resources, normalize_text, preprocess_text
+
+pytest.importorskip("nltk")
+
+missing = missing_nltk_resources(["punkt", "punkt_tab", "stopwords", "wordnet"])
+pytestmark = pytest.mark.skipif(bool(missing), reason=f"NLTK data not installed: {', '.join(missing)}")
+
+EDGE_CASES = [
+    "",
+    "   ",
+    None,
+    float("nan"),
+    "Great scooter!!! 10/10, would buy again :)",
+    "I cannot believe the range; gonna buy another one, wanna try the Pro.",
+    "Batteries, chargers and motors: the batteries were replaced twice.",
+    "Ã©lectrique — café-racer style, NOT worth it...",
+    "It's the rider's choice: don't, won't, can't.",
+    "GIMME more range\nlemme know\tgotta charge",
+]
+
+
+def _bundled_reviews():
+    # Every review of every bundled CSV
+    reviews = []
+    for path in SOURCE_FILES.values():
+        reviews += pd.read_csv(path, usecols=["Review"])["Review"].tolist()
+    return reviews
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_normalize_text_matches_chain_on_edge_cases(text):
+    assert normalize_text(text) == lemmatize_text(preprocess_text(text))
+
+
+def test_normalize_text_matches_chain_on_bundled_reviews():
+    mismatches = [
+        text for text in _bundled_reviews()
+        if normalize_text(text) != lemmatize_text(preprocess_text(text))
+    ]
+    assert not mismatches, f"{len(mismatches)} mismatches, e.g. {mismatches[0][:80]!r}"
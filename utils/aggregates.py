@@ -0,0 +1,150 @@
+# aggregates.py
+# Per-model aggregate index keyed by (Vehicle_Type, Model_Name), built once per
+# data version (see ReviewData.model_index) so tabs look values up instead of
+# filtering and re-averaging the review frame on every rerun.
+#
+# The index keeps additive totals (sums, counts, min/max), so the index of newly
+# ingested reviews can be merged into an existing one without a rebuild.
+import numpy as np
+import pandas as pd
+from utils.data_loader import ENRICHED_COLUMNS
+
+SENTIMENT_LABELS = ["Positive", "Neutral", "Negative"]
+
+# Columns never averaged as attribute scores (cardekho's attribute lists are
+# indexed separately, see utils.mentions)
+NON_ATTRIBUTE_COLUMNS = ["Review", "Model_Name", "Vehicle_Type", "Attributes"] + ENRICHED_COLUMNS
+
+_SUM_COLUMNS = [
+    "Review Count", "Text Reviews", "Length Sum",
+    "Rating Sum", "Rating SumSq", "Rating Count",
+    *SENTIMENT_LABELS, "Score Sum", "Score Count",
+]
+
+
+class ModelIndex:
+    # attribute_means: mean of every numeric-coercible column per model
+    # stats: review counts, review length, rating stats and, when the data carries
+    #        precomputed predictions, sentiment label shares and mean predicted score
+
+    def __init__(self, attribute_sums, attribute_counts, totals):
+        self.attribute_sums = attribute_sums
+        self.attribute_counts = attribute_counts
+        self.totals = totals
+
+        self.attribute_means = attribute_sums / attribute_counts.where(attribute_counts > 0)
+        self.stats = self._derive_stats(totals)
+        self.has_sentiment = bool((totals["Score Count"] > 0).any())
+
+    @staticmethod
+    def _derive_stats(totals):
+        rating_count = totals["Rating Count"].where(totals["Rating Count"] > 0)
+        rating_mean = totals["Rating Sum"] / rating_count
+        # Sample standard deviation, as pandas' std()
+        rating_var = (totals["Rating SumSq"] - totals["Rating Sum"] * rating_mean) / (rating_count - 1)
+        labelled = totals[SENTIMENT_LABELS].sum(axis=1)
+        labelled = labelled.where(labelled > 0)
+        score_count = totals["Score Count"].where(totals["Score Count"] > 0)
+
+        stats = pd.DataFrame({
+            "Review Count": totals["Review Count"].astype(int),
+            "Text Reviews": totals["Text Reviews"].astype(int),
+            "Mean Review Length": totals["Length Sum"] / totals["Review Count"],
+            "Rating Mean": rating_mean,
+            "Rating Std": np.sqrt(rating_var.clip(lower=0)),
+            "Rating Min": totals["Rating Min"],
+            "Rating Max": totals["Rating Max"],
+            "Rating Count": totals["Rating Count"].astype(int),
+        })
+        for label in SENTIMENT_LABELS:
+            stats[label] = totals[label] / labelled
+        stats["Mean Predicted Score"] = totals["Score Sum"] / score_count
+        return stats
+
+    def models(self, vehicle_type):
+        if vehicle_type not in self.stats.index.get_level_values(0):
+            return []
+        return sorted(self.stats.loc[vehicle_type].index)
+
+    def __contains__(self, key):
+        return key in self.stats.index
+
+    def attribute_means_for(self, vehicle_type, model_name):
+        return self.attribute_means.loc[(vehicle_type, model_name)]
+
+    def stats_for(self, vehicle_type, model_name):
+        return self.stats.loc[(vehicle_type, model_name)]
+
+    def merge(self, other):
+        # Index over the union of both review sets
+        totals = self.totals[_SUM_COLUMNS].add(other.totals[_SUM_COLUMNS], fill_value=0)
+        totals["Rating Min"] = pd.concat([self.totals["Rating Min"], other.totals["Rating Min"]], axis=1).min(axis=1)
+        totals["Rating Max"] = pd.concat([self.totals["Rating Max"], other.totals["Rating Max"]], axis=1).max(axis=1)
+        return ModelIndex(
+            self.attribute_sums.add(other.attribute_sums, fill_value=0).sort_index(),
+            self.attribute_counts.add(other.attribute_counts, fill_value=0).sort_index(),
+            totals.sort_index(),
+        )
+
+
+def _model_totals(df):
+    model = df["Model_Name"]
+    reviewed = df[df["Review"].notna()]
+    # Missing reviews count as len(str(nan)), whatever the text dtype, as the tabs always have
+    lengths = df["Review"].str.len().fillna(len(str(np.nan)))
+    totals = pd.DataFrame({
+        "Review Count": model.groupby(model, observed=True).size(),
+        "Text Reviews": reviewed.groupby("Model_Name", observed=True).size(),
+        "Length Sum": lengths.groupby(model, observed=True).sum(),
+    })
+
+    # Ratings may be held as float32 (see compact_frame); accumulate in float64
+    if "Rating" in df.columns:
+        rating = pd.to_numeric(df["Rating"], errors="coerce").astype("float64")
+    else:
+        rating = pd.Series(np.nan, index=df.index)
+    rating_groups = rating.groupby(model, observed=True)
+    totals["Rating Sum"] = rating_groups.sum()
+    totals["Rating SumSq"] = (rating ** 2).groupby(model, observed=True).sum()
+    totals["Rating Count"] = rating_groups.count()
+    totals["Rating Min"] = rating_groups.min()
+    totals["Rating Max"] = rating_groups.max()
+
+    if "Predicted Sentiment" in df.columns:
+        labels = reviewed["Predicted Sentiment"].astype(str)
+        label_counts = labels.groupby([reviewed["Model_Name"], labels], observed=True).size().unstack(fill_value=0)
+        totals = totals.join(label_counts.reindex(columns=SENTIMENT_LABELS, fill_value=0))
+    for label in SENTIMENT_LABELS:
+        if label not in totals.columns:
+            totals[label] = 0
+
+    if "Predicted Score" in df.columns:
+        scores = reviewed["Predicted Score"].astype(float).groupby(reviewed["Model_Name"], observed=True)
+        totals["Score Sum"] = scores.sum()
+        totals["Score Count"] = scores.count()
+    else:
+        totals["Score Sum"] = 0.0
+        totals["Score Count"] = 0
+
+    fill = {column: 0 for column in _SUM_COLUMNS}
+    return totals.fillna(fill)
+
+
+def build_model_index(frames):
+    # frames: {vehicle_type: review frame}
+    attribute_sums, attribute_counts, totals = {}, {}, {}
+    for vehicle_type, df in frames.items():
+        df = df[df["Model_Name"].notna()]
+        numeric = df.drop(columns=[c for c in NON_ATTRIBUTE_COLUMNS if c in df.columns])
+        numeric = numeric.apply(pd.to_numeric, errors="coerce").astype("float64")
+        groups = numeric.groupby(df["Model_Name"], observed=True)
+        attribute_sums[vehicle_type] = groups.sum()
+        attribute_counts[vehicle_type] = groups.count()
+        totals[vehicle_type] = _model_totals(df)
+
+    names = ["Vehicle_Type", "Model_Name"]
+    return ModelIndex(
+        pd.concat(attribute_sums, names=names).sort_index(),
+        pd.concat(attribute_counts, names=names).sort_index(),
+        pd.concat(totals, names=names).sort_index(),
+    )
@@ -0,0 +1,385 @@
+# artifacts.py
+# Compact, version-independent model artifacts exported from the pickles in models/:
+#   booster.txt     LightGBM native text model
+#   classes.npy     class labels, in booster output order
+#   vocabulary.npy  vectorizer terms as fixed-width UTF-8 bytes, sorted bytewise
+#   vocabulary_columns.npy  matrix column of each sorted term
+#   idf.npy         vectorizer IDF weights, indexed by column
+#   term_columns.npy  (--prune only) vocabulary columns the booster splits on
+#   manifest.json   vectorizer params, per-file sha256, overall content hash and
+#                   the fingerprint of the pickles the export came from
+# The vectorizer arrays are opened with mmap_mode="r" and used in place: tokens
+# are looked up with np.searchsorted on the mapped terms (MappedVocabulary), so
+# app and worker processes share those pages rather than each building a term
+# dict. The booster is parsed by LightGBM into each process's own memory.
+#
+# With --prune the booster is rewritten over only the feature columns its trees
+# split on (the VADER column included), and inference hands it just those TF-IDF
+# columns. The vectorizer itself keeps the full vocabulary: rows are L2-normalized
+# over every term, so the kept values are bit-identical to the full transform's.
+# `parity` checks that both pipelines give identical predictions on the bundled CSVs.
+#
+#   python -m utils.artifacts export [--output-dir models/compact] [--prune]
+#   python -m utils.artifacts verify [--output-dir models/compact]
+#   python -m utils.artifacts parity [--output-dir models/compact]
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import time
+from collections.abc import Mapping
+import numpy as np
+import scipy.sparse as sp
+from utils.cache import MODEL_FILES, model_fingerprint
+
+ARTIFACT_DIR = "models/compact"
+MANIFEST = "manifest.json"
+ARTIFACT_FILES = ["booster.txt", "classes.npy", "vocabulary.npy", "vocabulary_columns.npy", "idf.npy"]
+
+# Bumped when the file layout changes; older exports are not loaded
+FORMAT = 2
+
+# TfidfVectorizer params needed to rebuild an equivalent transform
+VECTORIZER_PARAMS = [
+    "analyzer", "binary", "decode_error", "encoding", "input", "lowercase",
+    "ngram_range", "norm", "smooth_idf", "strip_accents", "sublinear_tf",
+    "token_pattern", "use_idf",
+]
+
+
+class NativeClassifier:
+    # Minimal stand-in for LGBMClassifier.predict on top of a native Booster.
+    # term_columns: for a pruned booster, the TF-IDF columns it was remapped to
+
+    def __init__(self, booster, classes, term_columns=None):
+        self.booster_ = booster
+        self.classes_ = classes
+        self.term_columns = term_columns
+
+    def predict(self, X):
+        proba = self.booster_.predict(X)
+        if proba.ndim == 1:
+            class_index = (proba > 0.5).astype(int)
+        else:
+            class_index = np.argmax(proba, axis=1)
+        return self.classes_[class_index]
+
+
+class MappedVocabulary(Mapping):
+    # term -> column over the export's sorted UTF-8 terms, read straight from
+    # the memory map. lookup() resolves a whole batch of tokens with one
+    # np.searchsorted; item access is there for the Mapping interface.
+
+    def __init__(self, terms, columns):
+        self.terms = terms
+        self.columns = columns
+        self.width = terms.dtype.itemsize
+
+    def lookup(self, tokens):
+        # Column of every token, -1 where it is not in the vocabulary. Keys one
+        # byte wider than the terms: a longer token stays longer and never matches
+        keys = np.array([token.encode("utf-8") for token in tokens], dtype=f"S{self.width + 1}")
+        positions = np.searchsorted(self.terms, keys)
+        positions[positions == len(self.terms)] = 0
+        found = self.terms[positions] == keys
+        return np.where(found, self.columns[positions], -1)
+
+    def __getitem__(self, term):
+        column = self.lookup([term])[0]
+        if column < 0:
+            raise KeyError(term)
+        return int(column)
+
+    def __iter__(self):
+        return (term.decode("utf-8") for term in self.terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+
+class NativeVectorizer:
+    # Minimal stand-in for TfidfVectorizer.transform over a MappedVocabulary:
+    # the vectorizer's own analyzer, one batched vocabulary lookup, and the same
+    # TfidfTransformer step (tf weighting, IDF, normalization), so the output is
+    # identical to the pickled vectorizer's.
+
+    def __init__(self, params, vocabulary, idf):
+        from sklearn.feature_extraction.text import TfidfTransformer, TfidfVectorizer
+
+        self.vocabulary_ = vocabulary
+        self.idf_ = idf
+        self.binary = params["binary"]
+        self._analyze = TfidfVectorizer(**params).build_analyzer()
+        self._tfidf = TfidfTransformer(
+            norm=params["norm"], use_idf=params["use_idf"],
+            smooth_idf=params["smooth_idf"], sublinear_tf=params["sublinear_tf"],
+        )
+        self._tfidf.idf_ = idf
+
+    def transform(self, raw_documents):
+        tokens, lengths = [], []
+        for document in raw_documents:
+            document_tokens = self._analyze(document)
+            tokens.extend(document_tokens)
+            lengths.append(len(document_tokens))
+
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        columns = self.vocabulary_.lookup(tokens) if tokens else np.array([], dtype=np.int64)
+        found = columns >= 0
+        counts = sp.csr_matrix(
+            (np.ones(int(found.sum())), (rows[found], columns[found])),
+            shape=(len(lengths), len(self.vocabulary_)),
+        )
+        # Repeated tokens become one entry holding their count, indices sorted
+        counts.sum_duplicates()
+        if self.binary:
+            counts.data.fill(1)
+        return self._tfidf.transform(counts, copy=False)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _idf_weights(vectorizer):
+    # Pickles from older scikit-learn only keep the IDF diagonal matrix
+    tfidf = vectorizer._tfidf
+    if hasattr(tfidf, "idf_"):
+        return np.asarray(tfidf.idf_, dtype=np.float64)
+    return np.asarray(tfidf._idf_diag.diagonal(), dtype=np.float64)
+
+
+def load_pickles(model_path=MODEL_FILES[0], vectorizer_path=MODEL_FILES[1]):
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    with open(vectorizer_path, "rb") as f:
+        vectorizer = pickle.load(f)
+    # A vectorizer pickled by an older scikit-learn only has the IDF diagonal,
+    # which newer releases ignore (transform then skips IDF weighting entirely)
+    if not hasattr(vectorizer._tfidf, "idf_"):
+        vectorizer._tfidf.idf_ = _idf_weights(vectorizer)
+    return model, vectorizer
+
+
+def split_features(booster):
+    # Feature columns used by at least one split, ascending
+    return np.flatnonzero(booster.feature_importance("split") > 0)
+
+
+def prune_model_string(model_string, columns):
+    # The LightGBM text model rewritten over only `columns` (old feature indices,
+    # ascending), which must cover every split feature. Split indices, feature
+    # names/infos and importances are remapped and tree_sizes recomputed; the
+    # trees' thresholds and leaf values are left as they are.
+    columns = [int(column) for column in columns]
+    position = {old: new for new, old in enumerate(columns)}
+
+    trees_start = model_string.index("Tree=0\n")
+    trees_end = model_string.index("end of trees")
+    header, trees, tail = model_string[:trees_start], model_string[trees_start:trees_end], model_string[trees_end:]
+
+    def remap(match):
+        return "split_feature=" + " ".join(str(position[int(index)]) for index in match.group(1).split())
+
+    blocks = [
+        re.sub(r"^split_feature=(.*)$", remap, block, flags=re.M)
+        for block in re.split(r"(?m)^(?=Tree=\d+\n)", trees) if block
+    ]
+
+    lines = header.split("\n")
+    fields = {line.split("=", 1)[0]: i for i, line in enumerate(lines) if "=" in line}
+    old_names = lines[fields["feature_names"]].split("=", 1)[1].split(" ")
+    new_names = [f"Column_{new}" for new in range(len(columns))]
+    infos = lines[fields["feature_infos"]].split("=", 1)[1].split(" ")
+    lines[fields["max_feature_idx"]] = f"max_feature_idx={len(columns) - 1}"
+    lines[fields["feature_names"]] = "feature_names=" + " ".join(new_names)
+    lines[fields["feature_infos"]] = "feature_infos=" + " ".join(infos[old] for old in columns)
+    lines[fields["tree_sizes"]] = "tree_sizes=" + " ".join(str(len(block.encode())) for block in blocks)
+
+    renamed = {old_names[old]: new_names[new] for new, old in enumerate(columns)}
+    importances_start = tail.index("feature_importances:")
+    importances_end = tail.index("\n\n", importances_start)
+    importances = [
+        renamed[line.split("=", 1)[0]] + "=" + line.split("=", 1)[1] if "=" in line else line
+        for line in tail[importances_start:importances_end].split("\n")
+    ]
+    tail = tail[:importances_start] + "\n".join(importances) + tail[importances_end:]
+    return "\n".join(lines) + "".join(blocks) + tail
+
+
+def export_artifacts(output_dir=ARTIFACT_DIR, model_path=MODEL_FILES[0], vectorizer_path=MODEL_FILES[1], prune=False):
+    model, vectorizer = load_pickles(model_path, vectorizer_path)
+
+    os.makedirs(output_dir, exist_ok=True)
+    names = list(ARTIFACT_FILES)
+    booster = model.booster_
+    if prune:
+        # Term columns the trees split on, plus the VADER column appended after the vocabulary
+        n_terms = len(vectorizer.vocabulary_)
+        if booster.num_feature() != n_terms + 1:
+            raise ValueError(f"booster has {booster.num_feature()} features, expected {n_terms} terms + VADER")
+        columns = np.union1d(split_features(booster), [n_terms])
+        with open(os.path.join(output_dir, "booster.txt"), "w") as f:
+            f.write(prune_model_string(booster.model_to_string(), columns))
+        np.save(os.path.join(output_dir, "term_columns.npy"), columns[:-1].astype(np.int64))
+        names.append("term_columns.npy")
+    else:
+        booster.save_model(os.path.join(output_dir, "booster.txt"))
+        if os.path.exists(os.path.join(output_dir, "term_columns.npy")):
+            os.remove(os.path.join(output_dir, "term_columns.npy"))
+    np.save(os.path.join(output_dir, "classes.npy"), np.asarray(model.classes_))
+
+    terms = np.array([term.encode("utf-8") for term in vectorizer.vocabulary_], dtype=bytes)
+    columns = np.fromiter(vectorizer.vocabulary_.values(), dtype=np.int32, count=len(terms))
+    order = np.argsort(terms, kind="stable")
+    np.save(os.path.join(output_dir, "vocabulary.npy"), terms[order])
+    np.save(os.path.join(output_dir, "vocabulary_columns.npy"), columns[order])
+    np.save(os.path.join(output_dir, "idf.npy"), _idf_weights(vectorizer))
+
+    params = vectorizer.get_params()
+    files = {name: _sha256(os.path.join(output_dir, name)) for name in names}
+    manifest = {
+        "format": FORMAT,
+        "vectorizer_params": {
+            key: list(params[key]) if isinstance(params[key], tuple) else params[key]
+            for key in VECTORIZER_PARAMS
+        },
+        "files": files,
+        "content_hash": hashlib.sha256("".join(files[name] for name in names).encode()).hexdigest(),
+        "source_fingerprint": model_fingerprint((model_path, vectorizer_path)),
+    }
+    with open(os.path.join(output_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(artifact_dir=ARTIFACT_DIR):
+    path = os.path.join(artifact_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def verify_artifacts(artifact_dir=ARTIFACT_DIR):
+    # Names of artifact files whose sha256 no longer matches the manifest
+    manifest = read_manifest(artifact_dir)
+    if manifest is None:
+        return list(ARTIFACT_FILES)
+    return [
+        name for name, digest in manifest["files"].items()
+        if not os.path.exists(os.path.join(artifact_dir, name))
+        or _sha256(os.path.join(artifact_dir, name)) != digest
+    ]
+
+
+def is_current(artifact_dir=ARTIFACT_DIR):
+    # True when an export exists and was made from the pickles currently in models/
+    manifest = read_manifest(artifact_dir)
+    if manifest is None or manifest.get("format") != FORMAT:
+        return False
+    if all(os.path.exists(path) for path in MODEL_FILES):
+        return manifest["source_fingerprint"] == model_fingerprint()
+    return True
+
+
+def load_artifacts(artifact_dir=ARTIFACT_DIR):
+    import lightgbm as lgb
+
+    manifest = read_manifest(artifact_dir)
+    booster = lgb.Booster(model_file=os.path.join(artifact_dir, "booster.txt"))
+    classes = np.load(os.path.join(artifact_dir, "classes.npy"))
+    vocabulary = MappedVocabulary(
+        np.load(os.path.join(artifact_dir, "vocabulary.npy"), mmap_mode="r"),
+        np.load(os.path.join(artifact_dir, "vocabulary_columns.npy"), mmap_mode="r"),
+    )
+    idf = np.load(os.path.join(artifact_dir, "idf.npy"), mmap_mode="r")
+
+    params = dict(manifest["vectorizer_params"])
+    params["ngram_range"] = tuple(params["ngram_range"])
+    vectorizer = NativeVectorizer(params, vocabulary, idf)
+
+    term_columns = None
+    if "term_columns.npy" in manifest["files"]:
+        term_columns = np.load(os.path.join(artifact_dir, "term_columns.npy"))
+    return NativeClassifier(booster, classes, term_columns), vectorizer
+
+
+def check_parity(artifact_dir=ARTIFACT_DIR):
+    # Runs every review of the bundled CSVs through the pickled model and through
+    # the exported artifacts. Returns {pipeline: stats} plus whether the booster
+    # outputs (class probabilities) are bit-for-bit equal.
+    import pandas as pd
+    from utils import sentiment
+    from utils.data_loader import SOURCE_FILES
+
+    pipelines = {"pickle": load_pickles(), "artifacts": load_artifacts(artifact_dir)}
+
+    reviews = pd.concat([pd.read_csv(path)["Review"] for path in SOURCE_FILES.values()], ignore_index=True)
+    lemmatized = sentiment.lemmatize_reviews(reviews)
+    vader_scores = np.array([sentiment.get_sia().polarity_scores(text)["compound"] for text in lemmatized])
+
+    stats, outputs = {}, {}
+    for name, (pipeline_model, pipeline_vectorizer) in pipelines.items():
+        start = time.perf_counter()
+        features = sentiment.model_features(pipeline_vectorizer.transform(lemmatized), vader_scores, pipeline_model)
+        featurized = time.perf_counter()
+        outputs[name] = pipeline_model.booster_.predict(features)
+        predicted = time.perf_counter()
+        stats[name] = {
+            "features": features.shape[1],
+            "nnz": features.nnz,
+            "matrix_bytes": features.data.nbytes + features.indices.nbytes + features.indptr.nbytes,
+            "model_bytes": len(pipeline_model.booster_.model_to_string().encode()),
+            "featurize_s": featurized - start,
+            "predict_s": predicted - featurized,
+            "labels": np.asarray(pipeline_model.classes_)[np.argmax(outputs[name], axis=1)],
+        }
+    return {
+        "reviews": len(lemmatized),
+        "pipelines": stats,
+        "identical": np.array_equal(outputs["pickle"], outputs["artifacts"]),
+        "label_mismatches": int((stats["pickle"]["labels"] != stats["artifacts"]["labels"]).sum()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export, verify or parity-check compact model artifacts.")
+    parser.add_argument("command", choices=["export", "verify", "parity"])
+    parser.add_argument("--output-dir", default=ARTIFACT_DIR)
+    parser.add_argument("--prune", action="store_true",
+                        help="export: keep only the feature columns the booster splits on")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        manifest = export_artifacts(args.output_dir, prune=args.prune)
+        print(f"exported to {args.output_dir} (content hash {manifest['content_hash'][:16]})")
+    elif args.command == "parity":
+        report = check_parity(args.output_dir)
+        print(f"{report['reviews']} reviews from the bundled CSVs")
+        print(f"{'pipeline':<10} {'features':>9} {'nnz':>9} {'matrix KB':>10} {'model KB':>9} {'featurize ms':>13} {'predict ms':>11}")
+        for name, stats in report["pipelines"].items():
+            print(
+                f"{name:<10} {stats['features']:>9} {stats['nnz']:>9} {stats['matrix_bytes'] / 1e3:>10.1f}"
+                f" {stats['model_bytes'] / 1e3:>9.1f} {stats['featurize_s'] * 1000:>13.1f} {stats['predict_s'] * 1000:>11.1f}"
+            )
+        if not report["identical"]:
+            raise SystemExit(
+                f"parity FAILED: booster outputs differ ({report['label_mismatches']} labels differ)"
+            )
+        print("parity OK: booster outputs are bit-identical")
+    else:
+        mismatched = verify_artifacts(args.output_dir)
+        if mismatched:
+            raise SystemExit(f"hash mismatch or missing: {', '.join(mismatched)}")
+        print(f"{args.output_dir}: all artifact hashes match the manifest")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+# benchmark.py
+# Benchmark suite for the hot paths, at 1x, 10x, 100x and 1000x the bundled CSVs
+# (larger corpora come from utils.synthetic). Each stage runs once under
+# tracemalloc for its peak Python/NumPy allocation, then --repeat timed runs for
+# latency percentiles and throughput. Per-review stages work on a sample of at
+# most --max-items reviews, so they measure per-item cost at every scale.
+#
+#   python -m utils.benchmark [--scales 1,10,100,1000] [--stages load_data,rank_models]
+#                             [--save-baseline] [--check] [--threshold 0.25]
+#
+# --save-baseline records results in benchmarks/baseline.json (merged with what
+# is there); --check exits non-zero when a stage is slower (median) or larger
+# (peak memory) than its baseline by more than --threshold, or fails outright. Baselines are only
+# comparable on the machine that recorded them.
+import argparse
+import itertools
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from utils.data_loader import CHUNK_ROWS, SOURCE_FILES, load_data
+from utils.synthetic import write_corpus
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+SCALES = [1, 10, 100, 1000]
+REPEAT = 3
+MAX_ITEMS = 20_000
+THRESHOLD = 0.25
+
+# Attribute preferences used by the ranking stages (bikewale attributes)
+PREFERENCES = {"Performance": 2, "Comfort": 1, "Value for Money": 1, "Reliability": 1}
+
+
+class Corpus:
+    # One synthetic corpus; frames are loaded once and shared by the stages
+
+    def __init__(self, scale, seed=0):
+        self.scale = scale
+        self.paths = write_corpus(scale, seed=seed)
+        self._frames = None
+
+    @property
+    def frames(self):
+        if self._frames is None:
+            self._frames = dict(zip(SOURCE_FILES, load_data(paths=self.paths)))
+        return self._frames
+
+    @property
+    def rows(self):
+        return sum(len(df) for df in self.frames.values())
+
+    def reviews(self, max_items):
+        reviews = pd.concat([df["Review"] for df in self.frames.values()], ignore_index=True).dropna()
+        if len(reviews) > max_items:
+            reviews = reviews.sample(n=max_items, random_state=0)
+        return reviews.astype(str).tolist()
+
+    def labelled(self, max_items=None):
+        # All reviews with a deterministic stand-in sentiment label, for the plot stages
+        df = pd.concat(
+            [df[["Review", "Model_Name", "Vehicle_Type"]] for df in self.frames.values()], ignore_index=True
+        ).dropna(subset=["Review"])
+        if max_items is not None and len(df) > max_items:
+            df = df.sample(n=max_items, random_state=0)
+        labels = np.random.default_rng(0).choice(["Positive", "Neutral", "Negative"], len(df), p=[0.6, 0.25, 0.15])
+        return df.assign(**{"Predicted Sentiment": labels})
+
+
+# Each stage: setup(corpus, max_items) -> (run, items processed per run)
+
+def _load_data(corpus, max_items):
+    return lambda: load_data(paths=corpus.paths), corpus.rows
+
+def _load_data_typed(corpus, max_items):
+    return lambda: load_data(chunksize=CHUNK_ROWS, paths=corpus.paths), corpus.rows
+
+def _preprocess_text(corpus, max_items):
+    from utils.preprocessing import preprocess_text
+
+    texts = corpus.reviews(max_items)
+    return lambda: [preprocess_text(text) for text in texts], len(texts)
+
+def _lemmatize_text(corpus, max_items):
+    from utils.preprocessing import lemmatize_text, preprocess_text
+
+    texts = [preprocess_text(text) for text in corpus.reviews(max_items)]
+    return lambda: [lemmatize_text(text) for text in texts], len(texts)
+
+def _normalize_texts(corpus, max_items):
+    from utils.preprocessing import normalize_texts
+
+    texts = corpus.reviews(max_items)
+    return lambda: normalize_texts(texts), len(texts)
+
+def _score_reviews(corpus, max_items):
+    from utils.sentiment import score_reviews
+
+    texts = corpus.reviews(max_items)
+    return lambda: score_reviews(texts, use_cache=False), len(texts)
+
+def _label_reviews(corpus, max_items):
+    # Label-only mode: VADER without the TF-IDF transform and booster
+    from utils.sentiment import label_reviews
+
+    texts = corpus.reviews(max_items)
+    return lambda: label_reviews(texts, use_cache=False), len(texts)
+
+def _predict_numerical_score(corpus, max_items):
+    # Single-review latency (uncached, as predict_numerical_score on a new review)
+    from utils.sentiment import score_reviews
+
+    texts = itertools.cycle(corpus.reviews(max_items))
+    return lambda: score_reviews(list(itertools.islice(texts, 1)), use_cache=False), 1
+
+def _rank_models(corpus, max_items):
+    from utils.recommendation import rank_models_by_preferences
+
+    df = corpus.frames["bikewale"]
+    return lambda: rank_models_by_preferences(df, PREFERENCES), len(df)
+
+def _recommender_top_k(corpus, max_items):
+    from utils.aggregates import build_model_index
+    from utils.recommendation import AttributeRecommender
+
+    recommender = AttributeRecommender.from_index(build_model_index({"2W": corpus.frames["bikewale"]}), "2W")
+    return lambda: recommender.top_k(PREFERENCES, k=3), len(recommender.model_names)
+
+def _plot_pie_bar(corpus, max_items):
+    from utils.visualization import plot_sentiment_bar, plot_sentiment_pie
+
+    df = corpus.labelled()
+    return lambda: (plot_sentiment_pie(df), plot_sentiment_bar(df)), len(df)
+
+def _plot_scatter(corpus, max_items):
+    from utils.visualization import plot_sentiment_scatter
+
+    df = corpus.labelled()
+    return lambda: plot_sentiment_scatter(df).to_json(), len(df)
+
+def _plot_attribute_scores(corpus, max_items):
+    # Attribute tab chart of the most reviewed bikewale model, from the precomputed means
+    from utils.aggregates import build_model_index
+    from utils.visualization import plot_attribute_score_analysis
+
+    index = build_model_index({"2W": corpus.frames["bikewale"]})
+    model = max(index.models("2W"), key=lambda name: index.stats_for("2W", name)["Review Count"])
+    avg_scores = index.attribute_means_for("2W", model)
+    stats = index.stats_for("2W", model)
+    return lambda: plot_attribute_score_analysis(
+        model, avg_scores, int(stats["Review Count"]), stats["Mean Review Length"]
+    ).to_json(), len(avg_scores)
+
+def _plot_sentiment_comparison(corpus, max_items):
+    # Comparison tab chart over every bikewale model, with deterministic stand-in scores
+    from utils.visualization import plot_sentiment_comparison_bar
+
+    models = sorted(corpus.frames["bikewale"]["Model_Name"].dropna().unique())
+    scores = dict(zip(models, np.random.default_rng(0).uniform(1, 5, len(models))))
+    return lambda: plot_sentiment_comparison_bar(scores).to_json(), len(scores)
+
+def _plot_wordcloud(corpus, max_items):
+    # Token counts built once per data version, then one filter -> image
+    from utils.visualization import plot_wordcloud
+    from utils.wordfreq import token_counts, word_frequencies
+
+    counts = token_counts(corpus.labelled(max_items), "2W")
+    return lambda: plot_wordcloud(word_frequencies(counts, "2W", sentiment="Positive")), int(counts.sum())
+
+
+# (name, setup, minimum timed runs)
+STAGES = [
+    ("load_data", _load_data, 1),
+    ("load_data_typed", _load_data_typed, 1),
+    ("preprocess_text", _preprocess_text, 1),
+    ("lemmatize_text", _lemmatize_text, 1),
+    ("normalize_texts", _normalize_texts, 1),
+    ("score_reviews", _score_reviews, 1),
+    ("label_reviews", _label_reviews, 1),
+    ("predict_numerical_score", _predict_numerical_score, 50),
+    ("rank_models_by_preferences", _rank_models, 5),
+    ("recommender_top_k", _recommender_top_k, 50),
+    ("plot_pie_bar", _plot_pie_bar, 3),
+    ("plot_scatter", _plot_scatter, 3),
+    ("plot_attribute_score_analysis", _plot_attribute_scores, 3),
+    ("plot_sentiment_comparison_bar", _plot_sentiment_comparison, 3),
+    ("plot_wordcloud", _plot_wordcloud, 3),
+]
+
+
+def run_stage(setup, corpus, repeat, max_items):
+    run, items = setup(corpus, max_items)
+
+    # Warm-up run under tracemalloc: first-use costs (model load, caches) and peak memory
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+
+    p50 = float(np.percentile(durations, 50))
+    return {
+        "items": int(items),
+        "runs": len(durations),
+        "p50_s": p50,
+        "p95_s": float(np.percentile(durations, 95)),
+        "p99_s": float(np.percentile(durations, 99)),
+        "max_s": max(durations),
+        "throughput_per_s": items / p50 if p50 > 0 else None,
+        "peak_mb": peak / 1e6,
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    # [(key, metric, baseline value, current value)] past the threshold; a stage
+    # with a baseline that now fails is reported as metric "error" with its message
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base or "error" in base:
+            continue
+        if "error" in result:
+            regressions.append((key, "error", None, result["error"]))
+            continue
+        for metric in ("p50_s", "peak_mb"):
+            if base[metric] > 0 and result[metric] > base[metric] * (1 + threshold):
+                regressions.append((key, metric, base[metric], result[metric]))
+    return regressions
+
+
+def read_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def write_baseline(results, path=BASELINE_PATH):
+    merged = {**read_baseline(path), **results}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "meta": {
+                "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "processor": platform.processor() or platform.machine(),
+                "cpus": os.cpu_count(),
+            },
+            "results": dict(sorted(merged.items())),
+        }, f, indent=2)
+
+
+def format_row(key, result, base=None):
+    if "error" in result:
+        return f"{key:<36} failed: {result['error']}"
+    change = ""
+    if base and "error" not in base and base["p50_s"] > 0:
+        change = f"{(result['p50_s'] / base['p50_s'] - 1) * 100:+7.1f}%"
+    throughput = result["throughput_per_s"] or 0
+    return (
+        f"{key:<36} {result['items']:>9} {result['p50_s'] * 1000:10.1f} {result['p95_s'] * 1000:10.1f}"
+        f" {throughput:12.0f} {result['peak_mb']:9.1f} {change}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the hot paths at several corpus sizes.")
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)),
+                        help="comma-separated multiples of the bundled CSVs")
+    parser.add_argument("--stages", default=None, help="comma-separated stage names (default: all)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per stage (after one warm-up)")
+    parser.add_argument("--max-items", type=int, default=MAX_ITEMS, help="review sample size for per-review stages")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="record these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown / memory growth before a stage counts as regressed")
+    parser.add_argument("--output", default=None, help="also write this run's results as JSON")
+    args = parser.parse_args(argv)
+
+    scales = [int(scale) for scale in args.scales.split(",")]
+    stages = STAGES
+    if args.stages:
+        wanted = set(args.stages.split(","))
+        unknown = wanted - {name for name, _, _ in STAGES}
+        if unknown:
+            parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+        stages = [stage for stage in STAGES if stage[0] in wanted]
+
+    baseline = read_baseline(args.baseline)
+    results = {}
+    print(f"{'stage@scale':<36} {'items':>9} {'p50 ms':>10} {'p95 ms':>10} {'items/s':>12} {'peak MB':>9} vs baseline")
+    for scale in scales:
+        corpus = Corpus(scale)
+        for name, setup, min_runs in stages:
+            key = f"{name}@{scale}x"
+            try:
+                results[key] = run_stage(setup, corpus, max(args.repeat, min_runs), args.max_items)
+            except Exception as e:
+                results[key] = {"error": f"{type(e).__name__}: {e}".splitlines()[0]}
+            print(format_row(key, results[key], baseline.get(key)), flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        write_baseline({key: result for key, result in results.items() if "error" not in result}, args.baseline)
+        print(f"baseline written to {args.baseline}")
+
+    if args.check:
+        regressions = compare(results, baseline, args.threshold)
+        for key, metric, before, after in regressions:
+            if metric == "error":
+                print(f"REGRESSION {key} failed: {after}")
+                continue
+            print(f"REGRESSION {key} {metric}: {before:.4g} -> {after:.4g} ({(after / before - 1) * 100:+.0f}%)")
+        if regressions:
+            raise SystemExit(1)
+        print(f"no regressions past {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
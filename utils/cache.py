@@ -0,0 +1,148 @@
+# cache.py
+# Persistent on-disk cache of review predictions (label + score), stored in SQLite.
+# Rows are keyed by a hash of the review text plus a fingerprint of the model
+# and vectorizer pickles, so replacing either pickle invalidates the cache.
+# Label-only results (VADER label + compound, see sentiment.label_reviews) go in
+# a separate table keyed by the review alone: they do not depend on the pickles.
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+
+CACHE_DIR = os.environ.get("EV_CACHE_DIR", ".cache")
+MODEL_FILES = ("models/lightgbm_model.pkl", "models/vectorizer.pkl")
+
+# SQLite caps the number of bound parameters per statement
+_SQL_CHUNK = 500
+
+
+def model_fingerprint(paths=MODEL_FILES):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+def review_key(text):
+    # Non-string reviews (NaN) preprocess to "" so they share its prediction
+    if not isinstance(text, str):
+        text = ""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    def __init__(self, cache_dir=CACHE_DIR, fingerprint=None):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "predictions.sqlite")
+        self.fingerprint = fingerprint or model_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " fingerprint TEXT NOT NULL,"
+                " review_key TEXT NOT NULL,"
+                " label TEXT NOT NULL,"
+                " score INTEGER NOT NULL,"
+                " PRIMARY KEY (fingerprint, review_key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS labels ("
+                " review_key TEXT PRIMARY KEY,"
+                " label TEXT NOT NULL,"
+                " compound REAL NOT NULL)"
+            )
+            # Drop predictions made by any other model/vectorizer version
+            conn.execute("DELETE FROM predictions WHERE fingerprint != ?", (self.fingerprint,))
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, texts):
+        # Returns a list aligned with texts: (label, score) on a hit, None on a miss
+        keys = [review_key(text) for text in texts]
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._connect() as conn:
+            for start in range(0, len(unique_keys), _SQL_CHUNK):
+                chunk = unique_keys[start:start + _SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT review_key, label, score FROM predictions"
+                    f" WHERE fingerprint = ? AND review_key IN ({placeholders})",
+                    (self.fingerprint, *chunk),
+                )
+                for key, label, score in rows:
+                    found[key] = (label, score)
+
+        results = [found.get(key) for key in keys]
+        hits = sum(result is not None for result in results)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, predictions):
+        # predictions: {review_key: (label, score)}
+        rows = [(self.fingerprint, key, label, int(score)) for key, (label, score) in predictions.items()]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO predictions (fingerprint, review_key, label, score)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def get_labels(self, texts):
+        # Labels aligned with texts, from full predictions or label-only entries; None on a miss
+        keys = [review_key(text) for text in texts]
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._connect() as conn:
+            for start in range(0, len(unique_keys), _SQL_CHUNK):
+                chunk = unique_keys[start:start + _SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT review_key, label FROM labels WHERE review_key IN ({placeholders})"
+                    f" UNION ALL SELECT review_key, label FROM predictions"
+                    f" WHERE fingerprint = ? AND review_key IN ({placeholders})",
+                    (*chunk, self.fingerprint, *chunk),
+                )
+                for key, label in rows:
+                    found[key] = label
+
+        results = [found.get(key) for key in keys]
+        hits = sum(result is not None for result in results)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_labels(self, labels):
+        # labels: {review_key: (label, VADER compound)}
+        rows = [(key, label, float(compound)) for key, (label, compound) in labels.items()]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO labels (review_key, label, compound) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def stats(self):
+        with self._connect() as conn:
+            (size,) = conn.execute(
+                "SELECT COUNT(*) FROM predictions WHERE fingerprint = ?", (self.fingerprint,)
+            ).fetchone()
+            (labels,) = conn.execute("SELECT COUNT(*) FROM labels").fetchone()
+        return {
+            "hits": self.hits, "misses": self.misses, "entries": size, "label_entries": labels,
+            "fingerprint": self.fingerprint,
+        }
@@ -1,48 +1,570 @@
 # data_loader.py
 
+import glob
+import hashlib
+import importlib.util
+import os
+import threading
+from functools import cached_property
+import numpy as np
 import pandas as pd
+from utils import profiling
 
-def load_data():
-    # Load all three datasets
-    df_bike = pd.read_csv("data/2-wheeler-EV-bikewale.csv")
-    df_carwale = pd.read_csv("data/4-wheeler-EV-carwale.csv")
-    df_cardekho = pd.read_csv("data/4-wheeler-EV-cardekho.csv")
+# Raw review dumps, in the order load_data returns them
+SOURCE_FILES = {
+    "bikewale": "data/2-wheeler-EV-bikewale.csv",
+    "carwale": "data/4-wheeler-EV-carwale.csv",
+    "cardekho": "data/4-wheeler-EV-cardekho.csv",
+}
 
-    # Standardize column names
-    df_bike = df_bike.rename(columns={
+# Scored review store written by `python -m utils.enrich`
+ENRICHED_DIR = "data/enriched"
+
+# Parquet schema metadata keys of an enriched part: fingerprint of the model that
+# scored it, and the size in bytes of the source CSV the store covers with it
+ENRICHED_FINGERPRINT_KEY = b"ev_model_fingerprint"
+ENRICHED_CSV_BYTES_KEY = b"ev_csv_bytes"
+
+# Columns the enriched store adds on top of the load_data columns
+ENRICHED_COLUMNS = [
+    "Review Key", "Clean Review", "Review Length", "Token Count",
+    "VADER Compound", "Predicted Sentiment", "Predicted Score",
+]
+
+# Column renames and vehicle type per source
+SOURCE_RENAMES = {
+    "bikewale": {
         "rating": "Rating",
         "Review": "Review",
         "Model_Name": "Model_Name"
-    })
-
-    df_carwale = df_carwale.rename(columns={
+    },
+    "carwale": {
         "rating": "Rating",
         "Review": "Review",
         "Model_Name": "Model_Name"
-    })
-
-    df_cardekho = df_cardekho.rename(columns={
+    },
+    "cardekho": {
         "Rating": "Rating",
         "Review": "Review",
         "Model_Name": "Model_Name",
         "Attributes Mentioned": "Attributes"
-    })
+    },
+}
+SOURCE_VEHICLE_TYPES = {"bikewale": "2W", "carwale": "4W", "cardekho": "4W"}
 
-    df_bike["Vehicle_Type"] = "2W"
-    df_carwale["Vehicle_Type"] = "4W"
-    df_cardekho["Vehicle_Type"] = "4W"
+# Attribute columns added (empty) when a source lacks them, for consistency
+SOURCE_ATTRIBUTES = {
+    "bikewale": ['Visual Appeal', 'Reliability', 'Performance', 'Service Experience', 'Extra Features', 'Comfort', 'Maintenance cost', 'Value for Money'],
+    "carwale": ['Exterior', 'Comfort', 'Performance', 'Fuel Economy', 'Value for Money', 'Condition'],
+    "cardekho": [],
+}
+
+def normalize_source(df, source):
+    # Standardize column names
+    df = df.rename(columns=SOURCE_RENAMES[source])
+    df["Vehicle_Type"] = SOURCE_VEHICLE_TYPES[source]
 
     # Add missing attribute columns for consistency
-    bike_attributes = ['Visual Appeal', 'Reliability', 'Performance', 'Service Experience', 'Extra Features', 'Comfort', 'Maintenance cost', 'Value for Money']
-    for col in bike_attributes:
-        if col not in df_bike.columns:
-            df_bike[col] = None
+    for col in SOURCE_ATTRIBUTES[source]:
+        if col not in df.columns:
+            df[col] = None
+
+    # cardekho's `Attributes` lists stay text here; ReviewData.attribute_mentions
+    # parses them into a sparse index for Tab 3 (see utils.mentions)
+    return df
+
+def review_row_keys(df):
+    # Identity of a review row for deduplication: model name + review text
+    models = df["Model_Name"].astype("string").fillna("")
+    reviews = df["Review"].astype("string").fillna("")
+    return pd.Series(
+        [hashlib.sha1(f"{model}\x1f{review}".encode("utf-8")).hexdigest() for model, review in zip(models, reviews)],
+        index=df.index, dtype="string",
+    )
+
+# Explicit raw-column types per source for the streaming loader ("score" = 1-5 rating)
+SOURCE_SCHEMAS = {
+    "bikewale": {
+        "Review": "text", "Used it for": "label", "Owned for": "label", "Ridden for": "label",
+        "rating": "score", "Visual Appeal": "score", "Reliability": "score", "Performance": "score",
+        "Service Experience": "score", "Extra Features": "score", "Comfort": "score",
+        "Maintenance cost": "score", "Value for Money": "score", "Model_Name": "label",
+    },
+    "carwale": {
+        "Review": "text", "Exterior": "score", "Comfort": "score", "Performance": "score",
+        "Fuel Economy": "score", "Value for Money": "score", "Condition": "label", "driven": "label",
+        "rating": "score", "Model_Name": "label",
+    },
+    "cardekho": {
+        "Review": "text", "Rating": "score", "Attributes Mentioned": "text", "Model_Name": "label",
+    },
+}
+
+# One schema shared by every normalized chunk, whatever its source
+UNIFIED_SCHEMA = {
+    "Source": "label", "Vehicle_Type": "label", "Model_Name": "label", "Review": "text", "Rating": "score",
+    "Used it for": "label", "Owned for": "label", "Ridden for": "label", "Condition": "label", "driven": "label",
+    "Visual Appeal": "score", "Reliability": "score", "Performance": "score", "Service Experience": "score",
+    "Extra Features": "score", "Comfort": "score", "Maintenance cost": "score", "Value for Money": "score",
+    "Exterior": "score", "Fuel Economy": "score", "Attributes": "text",
+}
+
+# Rows per chunk in streaming mode
+CHUNK_ROWS = 50_000
+
+# Review text is held Arrow-backed when pyarrow is available (one contiguous
+# buffer instead of a Python str object per row)
+TEXT_DTYPE = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else "string"
+
+# Types of the enriched-store columns that compact_frame may need to restore
+ENRICHED_SCHEMA = {"Review Key": "text", "Clean Review": "text", "Predicted Sentiment": "label"}
+
+# Object columns outside the schemas with fewer distinct values per row than
+# this become categorical in compact_frame, the rest Arrow-backed text
+CATEGORY_MAX_RATIO = 0.5
+
+def _cast(df, schema):
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        if kind == "score":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+        elif kind == "label":
+            df[col] = df[col].astype("string").astype("category")
+        else:
+            df[col] = df[col].astype(TEXT_DTYPE)
+    return df
+
+def _compact_kind(series, kind):
+    # Kind a column is stored as in compact_frame, or None to keep its dtype
+    if kind is None:
+        if pd.api.types.is_float_dtype(series.dtype) or pd.api.types.is_integer_dtype(series.dtype):
+            # Only float64 and int64 ratings are narrowed; enriched int8/int32 stay
+            return "score" if series.dtype.itemsize == 8 else None
+        if series.dtype != object:
+            return None
+        if series.isna().all():
+            return "score"
+        kind = "label" if series.nunique() <= CATEGORY_MAX_RATIO * len(series) else "text"
+
+    if kind == "label" and isinstance(series.dtype, pd.CategoricalDtype):
+        return None
+    if kind == "score" and series.dtype == np.float32:
+        return None
+    if kind == "text" and series.dtype == TEXT_DTYPE:
+        return None
+    return kind
+
+def compact_frame(df):
+    # The same review frame in smaller dtypes: categorical labels (Model_Name,
+    # Vehicle_Type, Source, ...), float32 1-5 scores and Arrow-backed text.
+    # Columns already in their compact dtype are not copied.
+    known = {**UNIFIED_SCHEMA, **ENRICHED_SCHEMA}
+    schema = {}
+    for col in df.columns:
+        kind = _compact_kind(df[col], known.get(col))
+        if kind is not None:
+            schema[col] = kind
+    if not schema:
+        return df
+    return _cast(df.copy(deep=False), schema)
+
+def concat_frames(frames):
+    # pd.concat(ignore_index=True) that keeps categorical columns categorical:
+    # plain concat falls back to object whenever the category sets differ
+    frames = [df for df in frames if len(df.columns)]
+    shared = set.intersection(*(set(df.columns) for df in frames))
+    for col in shared:
+        if all(isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames):
+            categories = frames[0][col].cat.categories
+            for df in frames[1:]:
+                categories = categories.union(df[col].cat.categories)
+            frames = [df.assign(**{col: df[col].cat.set_categories(categories)}) for df in frames]
+    return compact_frame(pd.concat(frames, ignore_index=True))
+
+def conform_to_unified_schema(df, source):
+    # Normalized chunk -> UNIFIED_SCHEMA columns, in order, with their types
+    df = df.assign(Source=source).reindex(columns=list(UNIFIED_SCHEMA))
+    return _cast(df, UNIFIED_SCHEMA)
+
+def typed_source_frame(raw, source):
+    # Raw source rows -> normalized frame in UNIFIED_SCHEMA
+    return conform_to_unified_schema(normalize_source(_cast(raw, SOURCE_SCHEMAS[source]), source), source)
+
+def _read_chunks_pandas(path, source, chunksize):
+    dtypes = {col: "string" for col, kind in SOURCE_SCHEMAS[source].items() if kind != "score"}
+    yield from pd.read_csv(path, dtype=dtypes, chunksize=chunksize)
+
+def _read_chunks_pyarrow(path, source, chunksize):
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    column_types = {
+        col: pa.float32() if kind == "score" else pa.string()
+        for col, kind in SOURCE_SCHEMAS[source].items()
+    }
+    reader = pacsv.open_csv(
+        path,
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+    )
+    # Arrow record batches are sized in bytes; regroup them into ~chunksize rows
+    batches, rows = [], 0
+    for batch in reader:
+        batches.append(batch)
+        rows += batch.num_rows
+        if rows >= chunksize:
+            yield pa.Table.from_batches(batches).to_pandas()
+            batches, rows = [], 0
+    if batches:
+        yield pa.Table.from_batches(batches).to_pandas()
+
+def iter_source_chunks(source, path=None, chunksize=CHUNK_ROWS, engine="c"):
+    # Streams one source CSV as normalized, typed frames of at most ~chunksize rows,
+    # all sharing UNIFIED_SCHEMA. engine: "c" (pandas) or "pyarrow".
+    path = path or SOURCE_FILES[source]
+    read_chunks = _read_chunks_pyarrow if engine == "pyarrow" else _read_chunks_pandas
+    for chunk in read_chunks(path, source, chunksize):
+        yield typed_source_frame(chunk, source)
+
+def iter_review_chunks(chunksize=CHUNK_ROWS, engine="c"):
+    # (source, chunk) for every source, one chunk in memory at a time
+    for source in SOURCE_FILES:
+        for chunk in iter_source_chunks(source, chunksize=chunksize, engine=engine):
+            yield source, chunk
+
+def load_data(chunksize=None, engine="c", paths=None):
+    # Load all three datasets. With chunksize, each CSV is streamed through
+    # iter_source_chunks so parsing memory stays bounded and the frames come
+    # back typed (UNIFIED_SCHEMA); without it, the original whole-file read.
+    # paths: {source: csv path} to read instead of SOURCE_FILES
+    paths = paths or SOURCE_FILES
+    with profiling.stage("load_data"):
+        if chunksize is None:
+            return tuple(normalize_source(pd.read_csv(paths[source]), source) for source in SOURCE_FILES)
+
+        return tuple(
+            concat_frames(iter_source_chunks(source, path=paths[source], chunksize=chunksize, engine=engine))
+            for source in SOURCE_FILES
+        )
+
+
+def enriched_path(source):
+    return os.path.join(ENRICHED_DIR, f"{source}.parquet")
+
+def enriched_delta_paths(source):
+    # Parts appended by `python -m utils.ingest`, oldest first
+    return sorted(glob.glob(os.path.join(ENRICHED_DIR, f"{source}.delta-*.parquet")))
+
+def enriched_parts(source):
+    return [enriched_path(source)] + enriched_delta_paths(source)
+
+def source_of_part(path):
+    return os.path.basename(path).split(".")[0]
+
+def load_enriched_source(source):
+    return concat_frames(pd.read_parquet(path) for path in enriched_parts(source))
+
+def enriched_metadata(path):
+    # Schema metadata of an enriched part (Parquet footer only)
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(path).metadata or {}
+
+def enriched_fingerprint(path):
+    # Model fingerprint an enriched part was scored with (None for untagged parts)
+    value = enriched_metadata(path).get(ENRICHED_FINGERPRINT_KEY)
+    return value.decode() if value else None
+
+def enriched_csv_bytes(source):
+    # Source CSV size the store covers: the largest recorded by its parts, None
+    # when a part predates the record
+    if not os.path.exists(enriched_path(source)):
+        return None
+    sizes = [enriched_metadata(path).get(ENRICHED_CSV_BYTES_KEY) for path in enriched_parts(source)]
+    if not all(sizes):
+        return None
+    return max(int(size) for size in sizes)
+
+def enriched_covers_csv(source):
+    # A CSV modified after the newest part is still covered when it has exactly
+    # the size the parts record: `utils.ingest` commits a delta before appending
+    # its rows to the CSV
+    csv_path = SOURCE_FILES[source]
+    newest_part = max(os.path.getmtime(path) for path in enriched_parts(source))
+    if os.path.getmtime(csv_path) <= newest_part:
+        return True
+    return os.path.getsize(csv_path) == enriched_csv_bytes(source)
+
+def enriched_parts_current(paths):
+    # Whether every part was scored by the loaded model
+    from utils.sentiment import model_fingerprint
+
+    fingerprint = model_fingerprint()
+    return all(enriched_fingerprint(path) == fingerprint for path in paths)
+
+def load_enriched_data():
+    # Same frames as load_data, plus precomputed sentiment columns.
+    # Returns None if the store is missing, older than any source CSV, or was
+    # scored by another model version than the loaded one.
+    for source, csv_path in SOURCE_FILES.items():
+        if not os.path.exists(enriched_path(source)):
+            return None
+        if not enriched_covers_csv(source):
+            return None
+        if not enriched_parts_current(enriched_parts(source)):
+            return None
+
+    with profiling.stage("load_enriched_data"):
+        return tuple(load_enriched_source(source) for source in SOURCE_FILES)
+
+
+def data_version():
+    # (path, mtime, size) of every file the app may load; changes when any is replaced
+    paths = list(SOURCE_FILES.values())
+    for source in SOURCE_FILES:
+        paths += enriched_parts(source)
+    version = []
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            version.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def appended_parts(old_version, new_version):
+    # Delta parts added between two versions when nothing else changed except the
+    # source CSVs rows were appended to (possibly none: the CSV append that
+    # follows a delta); None when a full reload is needed
+    old_entries = {entry[0]: entry for entry in old_version}
+    new_entries = {entry[0]: entry for entry in new_version}
+    added = [path for path in new_entries if path not in old_entries]
+    if set(old_entries) - set(new_entries):
+        return None
+    if not all(".delta-" in os.path.basename(path) for path in added):
+        return None
+
+    csv_sources = {csv_path: source for source, csv_path in SOURCE_FILES.items()}
+    touched = {source_of_part(path) for path in added}
+    for path, entry in old_entries.items():
+        if new_entries[path] == entry:
+            continue
+        source = csv_sources.get(path)
+        if source is None:
+            return None
+        # The CSV of a source without new parts may only have grown to what the store covers
+        if source not in touched and new_entries[path][2] != enriched_csv_bytes(source):
+            return None
+    return sorted(added)
+
+
+class ReviewData:
+    # The three source frames plus the combined/normalized frames the tabs need,
+    # each built once on first access. Tabs must treat these as read-only.
+
+    def __init__(self, data_2w, data_4w_cw, data_4w_cd, version=None):
+        self.data_2w = data_2w
+        self.data_4w_cw = data_4w_cw
+        self.data_4w_cd = data_4w_cd
+        self.version = version
+
+    def sources(self):
+        return dict(zip(SOURCE_FILES, (self.data_2w, self.data_4w_cw, self.data_4w_cd)))
+
+    def with_appended(self, deltas, version):
+        # New ReviewData with {source: delta frame} appended. An already built
+        # model index is merged with the deltas' aggregates instead of rebuilt.
+        frames = self.sources()
+        for source, delta in deltas.items():
+            frames[source] = concat_frames([frames[source], delta])
+        appended = ReviewData(*frames.values(), version=version)
+
+        if "model_index" in self.__dict__:
+            from utils.aggregates import build_model_index
+
+            by_type = {}
+            for source, delta in deltas.items():
+                by_type.setdefault(SOURCE_VEHICLE_TYPES[source], []).append(delta)
+            delta_index = build_model_index(
+                {vehicle_type: pd.concat(parts, ignore_index=True) for vehicle_type, parts in by_type.items()}
+            )
+            appended.__dict__["model_index"] = self.model_index.merge(delta_index)
+
+        if "token_counts" in self.__dict__:
+            from utils.wordfreq import merge_token_counts, token_counts
+
+            counts = self.token_counts
+            for source, delta in deltas.items():
+                counts = merge_token_counts(counts, token_counts(delta, SOURCE_VEHICLE_TYPES[source]))
+            appended.__dict__["token_counts"] = counts
+
+        if "similarity_indexes" in self.__dict__:
+            from utils.similarity import build_similarity_index
+
+            indexes = dict(self.similarity_indexes)
+            for source, delta in deltas.items():
+                vehicle_type = SOURCE_VEHICLE_TYPES[source]
+                indexes[vehicle_type] = indexes[vehicle_type].merge(build_similarity_index(delta))
+            appended.__dict__["similarity_indexes"] = indexes
+
+        if "attribute_mentions" in self.__dict__ and "cardekho" in deltas:
+            from utils.mentions import build_mention_index
+
+            appended.__dict__["attribute_mentions"] = self.attribute_mentions.merge(
+                build_mention_index(deltas["cardekho"])
+            )
+        return appended
+
+    @cached_property
+    def data_4w(self):
+        return concat_frames([self.data_4w_cw, self.data_4w_cd])
+
+    def by_vehicle_type(self, vehicle_type):
+        return self.data_2w if vehicle_type == "2W" else self.data_4w
+
+    @cached_property
+    def model_index(self):
+        # Per-(vehicle type, model) aggregates; see utils.aggregates
+        from utils.aggregates import build_model_index
+
+        return build_model_index({"2W": self.data_2w, "4W": self.data_4w})
+
+    @cached_property
+    def recommenders(self):
+        # {vehicle type: AttributeRecommender} over the model index's attribute means
+        from utils.recommendation import AttributeRecommender
+
+        return {
+            vehicle_type: AttributeRecommender.from_index(self.model_index, vehicle_type)
+            for vehicle_type in ("2W", "4W")
+        }
+
+    @cached_property
+    def review_vectors(self):
+        # {vehicle type: (reviewed rows, TF-IDF matrix)}, shared by the similarity indexes
+        from utils.similarity import review_vectors
+
+        return {vehicle_type: review_vectors(self.by_vehicle_type(vehicle_type)) for vehicle_type in ("2W", "4W")}
+
+    @cached_property
+    def similarity_indexes(self):
+        # {vehicle type: ModelSimilarityIndex} of per-model review centroids; see utils.similarity
+        from utils.similarity import build_similarity_index
+
+        return {
+            vehicle_type: build_similarity_index(df, vectors=self.review_vectors[vehicle_type])
+            for vehicle_type, df in (("2W", self.data_2w), ("4W", self.data_4w))
+        }
+
+    @cached_property
+    def search_index(self):
+        # Review-level nearest-neighbour search (utils.similarity.ReviewSearchIndex).
+        # Not merged on ingestion: rebuilt from review_vectors on first use instead
+        from utils.similarity import build_search_index
+
+        return build_search_index({"2W": self.data_2w, "4W": self.data_4w}, vectors=self.review_vectors)
+
+    @cached_property
+    def model_sentiment(self):
+        # Mean predicted score (1-5) per (vehicle type, model): from the enriched
+        # store's predictions when present, otherwise scored once here
+        if self.model_index.has_sentiment:
+            return self.model_index.stats["Mean Predicted Score"]
+
+        from utils.sentiment import review_scores
+
+        means = {}
+        for vehicle_type in ("2W", "4W"):
+            reviewed = self.by_vehicle_type(vehicle_type).dropna(subset=["Review", "Model_Name"])
+            means[vehicle_type] = review_scores(reviewed).groupby(reviewed["Model_Name"], observed=True).mean()
+        return pd.concat(means, names=["Vehicle_Type", "Model_Name"]).sort_index()
+
+    @cached_property
+    def token_counts(self):
+        # Word-cloud token counts per (vehicle type, model, predicted sentiment);
+        # needs the enriched store's Predicted Sentiment column. See utils.wordfreq
+        from utils.wordfreq import build_token_counts
+
+        return build_token_counts({"2W": self.data_2w, "4W": self.data_4w})
+
+    @cached_property
+    def attribute_mentions(self):
+        # Sparse review x term index of cardekho's attribute lists, with per-model
+        # mention frequencies; see utils.mentions
+        from utils.mentions import build_mention_index
+
+        return build_mention_index(self.data_4w_cd)
+
+    @cached_property
+    def sentiment_data(self):
+        # All reviews with a shared "rating" column and readable vehicle types
+        def normalize_data(df, vehicle_type):
+            df = df.dropna(subset=["Review"])
+            if "rating" not in df.columns and "Rating" in df.columns:
+                df = df.rename(columns={"Rating": "rating"})
+            elif "rating" not in df.columns:
+                df = df.assign(rating=np.nan)  # Default if missing
+            return df.assign(Vehicle_Type=vehicle_type)
+
+        return concat_frames([
+            normalize_data(self.data_2w, "2-Wheeler"),
+            normalize_data(self.data_4w_cw, "4-Wheeler"),
+            normalize_data(self.data_4w_cd, "4-Wheeler"),
+        ])
+
+    def memory_report(self):
+        # memory_report over the source frames and whichever combined frames are built
+        frames = self.sources()
+        for name in ("data_4w", "sentiment_data"):
+            if name in self.__dict__:
+                frames[name] = self.__dict__[name]
+        return memory_report(frames)
+
+
+_review_data = None
+_review_data_lock = threading.Lock()
+
+def get_review_data():
+    # Process-wide ReviewData, reloaded only when a data file's mtime or size changes.
+    # Prefers the enriched store over the raw CSVs.
+    global _review_data
+    version = data_version()
+    with _review_data_lock:
+        if _review_data is not None and _review_data.version != version:
+            # Reviews ingested since the last load only need their delta parts read
+            parts = appended_parts(_review_data.version, version)
+            if parts == []:
+                # Only the CSV append of an already merged delta
+                _review_data.version = version
+            elif parts is not None and enriched_parts_current(parts):
+                deltas = {}
+                for path in parts:
+                    deltas.setdefault(source_of_part(path), []).append(pd.read_parquet(path))
+                deltas = {source: concat_frames(frames) for source, frames in deltas.items()}
+                _review_data = _review_data.with_appended(deltas, version)
+
+        if _review_data is None or _review_data.version != version:
+            frames = load_enriched_data() or load_data()
+            _review_data = ReviewData(*(compact_frame(df) for df in frames), version=version)
+        return _review_data
+
 
-    car_attributes = ['Exterior', 'Comfort', 'Performance', 'Fuel Economy', 'Value for Money', 'Condition']
-    for col in car_attributes:
-        if col not in df_carwale.columns:
-            df_carwale[col] = None
+def memory_report(frames):
+    # Deep memory use in bytes: one row per column (plus the index), one column
+    # per frame in {name: frame}, and a Total row
+    report = pd.concat({name: df.memory_usage(deep=True) for name, df in frames.items()}, axis=1, sort=False)
+    report = report.fillna(0).astype("int64")
+    report.loc["Total"] = report.sum()
+    return report
 
-    # We'll handle `Attributes` from cardekho in a separate logic for Tab 3
 
-    return df_bike, df_carwale, df_cardekho
+if __name__ == "__main__":
+    # Memory of the raw CSV frames vs. the compact ones the app holds
+    raw = dict(zip(SOURCE_FILES, load_data()))
+    compact = {source: compact_frame(df) for source, df in raw.items()}
+    print(memory_report(compact).to_string())
+    print()
+    for source in SOURCE_FILES:
+        before = raw[source].memory_usage(deep=True).sum()
+        after = compact[source].memory_usage(deep=True).sum()
+        print(f"{source:<10} {before / 1e6:8.2f} MB -> {after / 1e6:8.2f} MB ({after / before:.0%})")
@@ -0,0 +1,138 @@
+# enrich.py
+# Offline enrichment stage: scores every review once and writes a typed Parquet
+# store that the Streamlit app reads instead of running inference at view time.
+#
+#   python -m utils.enrich [--output-dir data/enriched] [--batch-size 512] [--workers 4]
+#                          [--rows-per-chunk 50000 [--engine pyarrow]]
+import argparse
+import glob
+import os
+import time
+import pandas as pd
+from utils.data_loader import (
+    SOURCE_FILES, ENRICHED_DIR, ENRICHED_CSV_BYTES_KEY, ENRICHED_FINGERPRINT_KEY, iter_source_chunks,
+    normalize_source, review_row_keys,
+)
+from utils.cache import review_key
+from utils.aggregates import SENTIMENT_LABELS
+from utils import sentiment
+
+
+def enrich_frame(df, batch_size=sentiment.BATCH_SIZE, workers=1, chunk_size=sentiment.CHUNK_SIZE):
+    df = df.copy()
+
+    # Attribute columns that load_data filled with None have no dtype yet
+    for col in df.columns:
+        if df[col].dtype == object and df[col].isna().all():
+            df[col] = df[col].astype("float64")
+
+    reviews = df["Review"]
+    lemmatized, compounds, labels, scores = sentiment.analyze_reviews(
+        reviews, batch_size=batch_size, workers=workers, chunk_size=chunk_size
+    )
+
+    # Warm the prediction cache for any caller that still scores raw text
+    sentiment.get_prediction_cache().put_many(
+        {review_key(text): (label, score) for text, label, score in zip(reviews, labels, scores)}
+    )
+
+    df["Review Key"] = review_row_keys(df)
+    df["Clean Review"] = pd.Series(lemmatized, index=df.index, dtype="string")
+    df["Review Length"] = reviews.fillna("").astype(str).str.len().astype("int32")
+    df["Token Count"] = df["Clean Review"].str.split().str.len().fillna(0).astype("int32")
+    df["VADER Compound"] = pd.Series(compounds, index=df.index, dtype="float32")
+    df["Predicted Sentiment"] = pd.Categorical(labels, categories=SENTIMENT_LABELS)
+    df["Predicted Score"] = pd.Series(scores, index=df.index, dtype="int8")
+    return df
+
+
+def tag_schema(schema, csv_bytes, metadata=None):
+    # Schema carrying the fingerprint of the model that scored the rows and the
+    # source CSV size the store covers, both checked by load_enriched_data
+    return schema.with_metadata({
+        **(schema.metadata or {}), **(metadata or {}),
+        ENRICHED_FINGERPRINT_KEY: sentiment.model_fingerprint().encode(),
+        ENRICHED_CSV_BYTES_KEY: str(csv_bytes).encode(),
+    })
+
+
+def write_enriched(df, path, csv_bytes, metadata=None):
+    # One enriched part, tagged (see tag_schema) and moved into place only once complete
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table.replace_schema_metadata(tag_schema(table.schema, csv_bytes, metadata).metadata), path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def _write_streaming(source, path, csv_bytes, args):
+    # Enrich one chunk at a time so memory stays bounded by the chunk size
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, schema, rows = None, None, 0
+    try:
+        for chunk in iter_source_chunks(source, chunksize=args.rows_per_chunk, engine=args.engine):
+            enriched = enrich_frame(
+                chunk, batch_size=args.batch_size, workers=args.workers, chunk_size=args.chunk_size
+            )
+            table = pa.Table.from_pandas(enriched, preserve_index=False)
+            if writer is None:
+                # Category code width varies per chunk; fix it so every chunk shares one schema
+                schema = tag_schema(pa.schema(
+                    [
+                        field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+                        if pa.types.is_dictionary(field.type) else field
+                        for field in table.schema
+                    ],
+                    metadata=table.schema.metadata,
+                ), csv_bytes)
+                writer = pq.ParquetWriter(path + ".tmp", schema)
+            writer.write_table(table.cast(schema))
+            rows += len(enriched)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        os.replace(path + ".tmp", path)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score all reviews and write the enriched Parquet store.")
+    parser.add_argument("--output-dir", default=ENRICHED_DIR)
+    parser.add_argument("--batch-size", type=int, default=sentiment.BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for scoring (0 = all cores)")
+    parser.add_argument("--chunk-size", type=int, default=sentiment.CHUNK_SIZE,
+                        help="reviews per worker task")
+    parser.add_argument("--rows-per-chunk", type=int, default=None,
+                        help="stream each CSV in chunks of this many rows (typed, bounded memory)")
+    parser.add_argument("--engine", choices=["c", "pyarrow"], default="c",
+                        help="CSV parser for streaming mode")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for source in SOURCE_FILES:
+        start = time.perf_counter()
+        path = os.path.join(args.output_dir, f"{source}.parquet")
+        # Rows appended to the CSV from here on are not covered by this rebuild
+        csv_bytes = os.path.getsize(SOURCE_FILES[source])
+        if args.rows_per_chunk:
+            rows = _write_streaming(source, path, csv_bytes, args)
+        else:
+            df = normalize_source(pd.read_csv(SOURCE_FILES[source]), source)
+            enriched = enrich_frame(
+                df, batch_size=args.batch_size, workers=args.workers, chunk_size=args.chunk_size
+            )
+            write_enriched(enriched, path, csv_bytes)
+            rows = len(enriched)
+        # A full rebuild already covers anything ingested since the last one
+        for delta_path in glob.glob(os.path.join(args.output_dir, f"{source}.delta-*.parquet")):
+            os.remove(delta_path)
+        print(f"{source}: {rows} reviews -> {path} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
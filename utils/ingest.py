@@ -0,0 +1,223 @@
+# ingest.py
+# Incremental ingestion of newly scraped review files into the enriched store.
+# Only rows not already stored (same model + review text) are scored; they are
+# written as a new delta part next to the store, which a running app picks up by
+# merging instead of reloading everything, and then appended to the source CSV.
+#
+# Stored review keys are kept in a SQLite index next to the prediction cache, so
+# deduplication looks up only the incoming keys. Its write lock is held for the
+# whole ingest, which serializes concurrent ingests. Each delta is committed
+# atomically (temp file + os.replace) before the CSV append, and records the
+# appended CSV rows: an append lost to a crash is redone by the next ingest.
+#
+#   python -m utils.ingest bikewale new_bikewale_reviews.csv [more.csv ...] [--workers 4]
+import argparse
+import contextlib
+import os
+import secrets
+import sqlite3
+import time
+import pandas as pd
+import pyarrow.parquet as pq
+from utils.cache import CACHE_DIR
+from utils.data_loader import (
+    ENRICHED_DIR, SOURCE_FILES, enriched_delta_paths, enriched_metadata, enriched_parts, enriched_path,
+    normalize_source, review_row_keys, typed_source_frame,
+)
+from utils.enrich import enrich_frame, write_enriched
+from utils import sentiment
+
+# Delta part metadata: CSV size before its rows were appended, and those rows
+CSV_APPEND_AT_KEY = b"ev_csv_append_at"
+CSV_APPEND_KEY = b"ev_csv_append"
+
+# Seconds an ingest waits for another one holding the key index
+LOCK_TIMEOUT = 3600
+
+# SQLite caps the number of bound parameters per statement
+_SQL_CHUNK = 500
+
+
+class StoredKeyIndex:
+    # Review keys of every enriched part per source. Parts are indexed once, by
+    # path, mtime and size; when an indexed part is replaced or removed (a
+    # `utils.enrich` rebuild), the source is re-indexed from its parts.
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "review_keys.sqlite")
+        with contextlib.closing(sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS review_keys ("
+                " source TEXT NOT NULL,"
+                " review_key TEXT NOT NULL,"
+                " PRIMARY KEY (source, review_key)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parts ("
+                " source TEXT NOT NULL,"
+                " path TEXT NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " PRIMARY KEY (source, path))"
+            )
+
+    @contextlib.contextmanager
+    def locked(self):
+        # One write transaction; other ingests wait for it to commit or roll back
+        conn = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def add(conn, source, path, keys):
+        # Record a part and its keys
+        conn.executemany(
+            "INSERT OR IGNORE INTO review_keys (source, review_key) VALUES (?, ?)",
+            ((source, key) for key in keys),
+        )
+        stat = os.stat(path)
+        conn.execute(
+            "INSERT OR REPLACE INTO parts (source, path, mtime_ns, size) VALUES (?, ?, ?, ?)",
+            (source, path, stat.st_mtime_ns, stat.st_size),
+        )
+
+    def sync(self, conn, source):
+        # Index the parts not indexed yet (normally none: ingests add their own)
+        current = {path: os.stat(path) for path in enriched_parts(source)}
+        indexed = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in conn.execute("SELECT path, mtime_ns, size FROM parts WHERE source = ?", (source,))
+        }
+        if any(
+            path not in current or (current[path].st_mtime_ns, current[path].st_size) != entry
+            for path, entry in indexed.items()
+        ):
+            conn.execute("DELETE FROM review_keys WHERE source = ?", (source,))
+            conn.execute("DELETE FROM parts WHERE source = ?", (source,))
+            indexed = {}
+        for path in current:
+            if path not in indexed:
+                self.add(conn, source, path, _part_keys(path))
+
+    def lookup(self, conn, source, keys):
+        # The given keys that are stored
+        keys = list(keys)
+        found = set()
+        for start in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[start:start + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT review_key FROM review_keys WHERE source = ? AND review_key IN ({placeholders})",
+                (source, *chunk),
+            )
+            found.update(key for key, in rows)
+        return found
+
+
+def _part_keys(path):
+    # Review keys of one part; only the key column is read
+    if "Review Key" in pq.read_schema(path).names:
+        return pd.read_parquet(path, columns=["Review Key"])["Review Key"]
+    return review_row_keys(pd.read_parquet(path, columns=["Model_Name", "Review"]))
+
+
+def _csv_rows(raw, csv_path):
+    # raw as CSV rows in the file's column order, ready to append
+    header = pd.read_csv(csv_path, nrows=0).columns
+    needs_newline = False
+    if os.path.getsize(csv_path) > 0:
+        with open(csv_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    rows = raw.reindex(columns=header).to_csv(header=False, index=False, lineterminator=os.linesep)
+    return (("\n" if needs_newline else "") + rows).encode("utf-8")
+
+
+def _finish_csv_append(source):
+    # Append the newest delta's rows to the CSV if a crash left them out
+    deltas = enriched_delta_paths(source)
+    if not deltas:
+        return
+    metadata = enriched_metadata(deltas[-1])
+    if CSV_APPEND_AT_KEY not in metadata:
+        return
+    if os.path.getsize(SOURCE_FILES[source]) == int(metadata[CSV_APPEND_AT_KEY]):
+        with open(SOURCE_FILES[source], "ab") as f:
+            f.write(metadata[CSV_APPEND_KEY])
+
+
+def _new_delta_path(source):
+    # Unique and in creation order: nanosecond timestamp plus a random suffix
+    return os.path.join(ENRICHED_DIR, f"{source}.delta-{time.time_ns():020d}-{secrets.token_hex(4)}.parquet")
+
+
+def ingest_reviews(source, raw, batch_size=sentiment.BATCH_SIZE, workers=1, chunk_size=sentiment.CHUNK_SIZE):
+    # raw: new reviews in the source's own CSV layout. Returns the newly scored rows.
+    if source not in SOURCE_FILES:
+        raise ValueError(f"Unknown source {source!r}; expected one of {', '.join(SOURCE_FILES)}")
+    if not os.path.exists(enriched_path(source)):
+        raise FileNotFoundError(f"{enriched_path(source)} not found; run `python -m utils.enrich` first")
+
+    raw = raw.reset_index(drop=True)
+    # Match the layout of the existing store (typed if it was built in streaming mode)
+    if "Source" in pq.read_schema(enriched_path(source)).names:
+        df = typed_source_frame(raw.copy(), source)
+    else:
+        df = normalize_source(raw.copy(), source)
+    keys = review_row_keys(df)
+
+    index = StoredKeyIndex()
+    with index.locked() as conn:
+        _finish_csv_append(source)
+        index.sync(conn, source)
+        is_new = ~keys.isin(index.lookup(conn, source, keys.unique())) & ~keys.duplicated()
+        if not is_new.any():
+            return df.iloc[0:0]
+
+        enriched = enrich_frame(
+            df[is_new].reset_index(drop=True), batch_size=batch_size, workers=workers, chunk_size=chunk_size
+        )
+        # The delta is committed first and covers the CSV as it will be after the
+        # append; the raw CSV then gets the same rows, so a full `utils.enrich`
+        # rebuild includes them
+        csv_path = SOURCE_FILES[source]
+        append_at = os.path.getsize(csv_path)
+        rows = _csv_rows(raw[is_new], csv_path)
+        path = _new_delta_path(source)
+        write_enriched(enriched, path, append_at + len(rows), {
+            CSV_APPEND_AT_KEY: str(append_at).encode(), CSV_APPEND_KEY: rows,
+        })
+        index.add(conn, source, path, enriched["Review Key"])
+        with open(csv_path, "ab") as f:
+            f.write(rows)
+    return enriched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score and append new review files to the enriched store.")
+    parser.add_argument("source", choices=list(SOURCE_FILES))
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--batch-size", type=int, default=sentiment.BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for scoring (0 = all cores)")
+    parser.add_argument("--chunk-size", type=int, default=sentiment.CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    raw = pd.concat([pd.read_csv(path) for path in args.files], ignore_index=True)
+    added = ingest_reviews(
+        args.source, raw, batch_size=args.batch_size, workers=args.workers, chunk_size=args.chunk_size
+    )
+    print(f"{args.source}: {len(raw)} reviews read, {len(added)} new, {len(raw) - len(added)} already stored")
+
+
+if __name__ == "__main__":
+    main()
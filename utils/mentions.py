@@ -0,0 +1,135 @@
+# mentions.py
+# Attribute terms mentioned per review, from cardekho's "Attributes Mentioned"
+# column (renamed "Attributes" by the loader). Values are NumPy array reprs such
+# as "['mileage' 'performance' 'power'\n 'price']". All rows are parsed in one
+# vectorized pass (str.findall, explode, factorize) into a sparse multi-hot
+# matrix (review x term) plus a term dictionary, built once per data version
+# (see ReviewData.attribute_mentions).
+#
+# Per-model mention frequencies (share of a model's parsed reviews mentioning
+# each term) are precomputed from the matrix, so the attribute tab looks them up
+# instead of re-parsing strings. Model names are matched case-insensitively:
+# cardekho writes "Tata Nexon EV" where carwale writes "tata nexon ev".
+#
+# Matrix rows follow the source frame's rows, and counts are additive, so the
+# index of newly ingested reviews merges in directly (rows stacked after).
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+ATTRIBUTE_COLUMN = "Attributes"
+
+# One quoted term of the array repr
+TERM_PATTERN = r"'([^']*)'"
+
+
+def model_key(names):
+    # Lookup key of model names: stripped and case-folded
+    return pd.Series(names, dtype="string").str.strip().str.casefold()
+
+
+class MentionIndex:
+    # matrix: CSR multi-hot (uint8), one row per source row, one column per term
+    # terms: term of each matrix column
+    # counts: model key x term, reviews mentioning the term
+    # reviews: reviews with a parsed attribute list per model key
+
+    def __init__(self, matrix, terms, counts, reviews):
+        self.matrix = matrix
+        self.terms = np.asarray(terms, dtype=object)
+        self.term_ids = {term: column for column, term in enumerate(self.terms)}
+        self.counts = counts
+        self.reviews = reviews
+        self.frequencies = counts.div(reviews.where(reviews > 0), axis=0)
+
+    def __contains__(self, model_name):
+        return model_key([model_name]).iloc[0] in self.frequencies.index
+
+    def frequencies_for(self, model_name):
+        # Mention share per term for one model, most mentioned first (empty when unknown)
+        key = model_key([model_name]).iloc[0]
+        if key not in self.frequencies.index:
+            return pd.Series(dtype=float)
+        frequencies = self.frequencies.loc[key]
+        return frequencies[frequencies > 0].sort_values(ascending=False, kind="stable")
+
+    def reviews_for(self, model_name):
+        key = model_key([model_name]).iloc[0]
+        return int(self.reviews.get(key, 0))
+
+    def mentioning(self, term):
+        # Row positions of the reviews mentioning term
+        column = self.term_ids.get(term)
+        if column is None:
+            return np.array([], dtype=np.int64)
+        return self.matrix[:, column].nonzero()[0]
+
+    def merge(self, other):
+        # Index over both review sets, other's rows after this one's
+        term_ids = dict(self.term_ids)
+        for term in other.terms:
+            term_ids.setdefault(term, len(term_ids))
+        terms = list(term_ids)
+        remap = np.array([term_ids[term] for term in other.terms], dtype=np.int64)
+        other_matrix = other.matrix.tocoo()
+        other_matrix = sp.csr_matrix(
+            (other_matrix.data, (other_matrix.row, remap[other_matrix.col])),
+            shape=(other.matrix.shape[0], len(terms)),
+        )
+        matrix = sp.vstack(
+            [sp.csr_matrix(self.matrix, shape=(self.matrix.shape[0], len(terms))), other_matrix], format="csr"
+        )
+        counts = self.counts.add(other.counts, fill_value=0).reindex(columns=terms).fillna(0)
+        reviews = self.reviews.add(other.reviews, fill_value=0)
+        return MentionIndex(matrix, terms, counts.astype("int64").sort_index(), reviews.astype("int64").sort_index())
+
+
+def parse_mentions(values):
+    # (CSR multi-hot matrix, terms) of a column of attribute-list strings
+    values = pd.Series(values, dtype="string").reset_index(drop=True)
+    mentions = values.str.findall(TERM_PATTERN).explode().dropna()
+    mentions = mentions.astype("string").str.strip().str.casefold()
+    mentions = mentions[mentions != ""]
+
+    codes, terms = pd.factorize(mentions, sort=True)
+    matrix = sp.csr_matrix(
+        (np.ones(len(codes), dtype=np.uint8), (mentions.index.to_numpy(dtype=np.int64), codes)),
+        shape=(len(values), len(terms)),
+    )
+    # A term repeated within one review still counts once
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix, np.asarray(terms, dtype=object)
+
+
+def build_mention_index(df):
+    # MentionIndex of one review frame; rows without the column or a model name count nowhere
+    if ATTRIBUTE_COLUMN in df.columns:
+        values = df[ATTRIBUTE_COLUMN]
+    else:
+        values = pd.Series(pd.NA, index=df.index, dtype="string")
+    matrix, terms = parse_mentions(values)
+
+    parsed = values.notna().to_numpy()
+    keys = model_key(df["Model_Name"].astype("string"))
+    model_codes, models = pd.factorize(keys, sort=True)
+    rows = np.flatnonzero((model_codes >= 0) & parsed)
+    # Model x review membership, so the per-model counts are one sparse product
+    membership = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (model_codes[rows], rows)), shape=(len(models), len(values))
+    )
+    counts = membership @ matrix.astype(np.int64)
+
+    models = pd.Index(np.asarray(models, dtype=object), name="Model_Name")
+    counts = pd.DataFrame(counts.toarray(), index=models, columns=terms)
+    reviews = pd.Series(np.bincount(model_codes[rows], minlength=len(models)), index=models, name="Reviews")
+    return MentionIndex(matrix, terms, counts, reviews)
+
+
+if __name__ == "__main__":
+    # Term dictionary and per-model mention frequencies of the cardekho reviews
+    from utils.data_loader import get_review_data
+
+    index = get_review_data().attribute_mentions
+    print(f"{index.matrix.shape[0]} reviews x {len(index.terms)} terms, {index.matrix.nnz} mentions")
+    print(index.frequencies.T.round(2).to_string())
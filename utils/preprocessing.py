@@ -1,35 +1,118 @@
 # preprocessing.py
 
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+from functools import lru_cache
 
-# Download necessary NLTK data
-nltk.download("punkt", quiet=True)
-nltk.download("stopwords", quiet=True)
-nltk.download("wordnet", quiet=True)
+# NLTK data this package uses, by download name -> nltk.data path.
+# nltk itself is imported on first use and nothing is downloaded at import;
+# see ensure_nltk_resources.
+NLTK_RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+}
 
-stop_words = set(stopwords.words("english"))
-lemmatizer = WordNetLemmatizer()
+_checked_resources = set()
+
+def missing_nltk_resources(names=None):
+    # Local-only check (no network): resources not found in any nltk_data path.
+    # names=None checks every resource
+    import nltk
+
+    missing = []
+    for name in NLTK_RESOURCES if names is None else names:
+        try:
+            nltk.data.find(NLTK_RESOURCES[name])
+        except LookupError:
+            missing.append(name)
+    return missing
+
+def ensure_nltk_resources(*names):
+    # Checks the local nltk_data first and only downloads what is missing, once
+    # per resource per process; called per review, so a resource already checked
+    # costs a set lookup. A failed download is retried on the next call
+    names = [name for name in names or NLTK_RESOURCES if name not in _checked_resources]
+    if not names:
+        return
+    import nltk
+
+    missing = missing_nltk_resources(names)
+    _checked_resources.update(name for name in names if name not in missing)
+    for name in missing:
+        if nltk.download(name, quiet=True):
+            _checked_resources.add(name)
+
+@lru_cache(maxsize=None)
+def get_stop_words():
+    from nltk.corpus import stopwords
+
+    ensure_nltk_resources("stopwords")
+    return frozenset(stopwords.words("english"))
+
+@lru_cache(maxsize=None)
+def get_lemmatizer():
+    from nltk.stem import WordNetLemmatizer
+
+    ensure_nltk_resources("wordnet")
+    return WordNetLemmatizer()
+
+def _word_tokenize(text):
+    from nltk.tokenize import word_tokenize
+
+    ensure_nltk_resources("punkt", "punkt_tab")
+    return word_tokenize(text)
+
+NON_ALPHA_PATTERN = re.compile(r"[^a-zA-Z\s]")
+
+# After NON_ALPHA_PATTERN cleanup word_tokenize is a plain whitespace split,
+# except for the contractions its Treebank rules break apart ("cannot" -> "can not")
+CONTRACTION_PATTERN = re.compile(r"\b(?:cannot|gimme|gonna|gotta|lemme|wanna)\b")
+
+# Max distinct tokens kept in the token -> lemma memo table
+LEMMA_CACHE_SIZE = 100_000
 
 def preprocess_text(text):
     if not isinstance(text, str):
         return ""
     
     # Remove non-alphabet characters and lowercase
-    text = re.sub(r"[^a-zA-Z\s]", "", text).lower()
+    text = NON_ALPHA_PATTERN.sub("", text).lower()
 
     # Tokenize
-    words = word_tokenize(text)
+    words = _word_tokenize(text)
 
     # Remove stopwords
+    stop_words = get_stop_words()
     words = [word for word in words if word not in stop_words]
 
     # Join back into string
     return " ".join(words)
 
 def lemmatize_text(text):
-    tokens = word_tokenize(text)
+    tokens = _word_tokenize(text)
+    lemmatizer = get_lemmatizer()
     return " ".join([lemmatizer.lemmatize(token) for token in tokens])
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize_token(token):
+    return get_lemmatizer().lemmatize(token)
+
+def normalize_text(text):
+    # Single-pass equivalent of lemmatize_text(preprocess_text(text))
+    if not isinstance(text, str):
+        return ""
+
+    text = NON_ALPHA_PATTERN.sub("", text).lower()
+    tokens = _word_tokenize(text) if CONTRACTION_PATTERN.search(text) else text.split()
+    stop_words = get_stop_words()
+    return " ".join([lemmatize_token(token) for token in tokens if token not in stop_words])
+
+def iter_normalized(texts):
+    for text in texts:
+        yield normalize_text(text)
+
+def normalize_texts(texts):
+    return [normalize_text(text) for text in texts]
@@ -0,0 +1,180 @@
+# profiling.py
+# Stage timing for the hot paths: data loading, text preprocessing, the TF-IDF
+# transform, VADER, model predict and figure building. Instrumentation is off by
+# default; while off, stage() is one flag check returning a shared no-op context
+# and timed() calls straight through.
+#
+# Two consumers:
+#   - Prometheus: enable() (or EV_PROFILE=1) records every stage into
+#     ev_stage_seconds (histogram) and ev_stage_items_total / ev_stage_errors_total
+#     (counters), labelled by stage, tab and batch size (rounded up to a power of
+#     two). EV_METRICS_PORT=9100 serves them from the Streamlit process;
+#     `python -m utils.server --metrics` serves them on the service's /metrics.
+#   - The app's performance panel: record() collects the stages of one rerun,
+#     whether or not Prometheus export is on.
+#
+# Stages run in worker processes (analyze_reviews with workers > 1) are not seen.
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from threading import Lock
+
+# Histogram buckets in seconds: sub-millisecond lookups up to full-corpus scoring
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_enabled = False
+_metrics = None
+_metrics_lock = Lock()
+_NULL = nullcontext()
+
+# Per thread / task: the tab being rendered and the current rerun's records (None = not recording)
+_tab = ContextVar("profiling_tab", default="none")
+_records = ContextVar("profiling_records", default=None)
+
+
+class _Metrics:
+
+    def __init__(self):
+        from prometheus_client import Counter, Histogram
+
+        labels = ["stage", "tab", "batch_size"]
+        self.seconds = Histogram("ev_stage_seconds", "Wall time per stage call", labels, buckets=LATENCY_BUCKETS)
+        self.items = Counter("ev_stage_items", "Items (reviews, rows) processed per stage", labels)
+        self.errors = Counter("ev_stage_errors", "Stage calls that raised", labels)
+
+
+def enable():
+    # Start exporting stage metrics to the prometheus_client default registry
+    global _enabled, _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = _Metrics()
+        _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def batch_bucket(items):
+    # Batch-size label: items rounded up to a power of two, "" when not applicable
+    if items is None:
+        return ""
+    return str(1 << max(int(items) - 1, 0).bit_length()) if items else "0"
+
+
+def observe(name, seconds, items=None, failed=False):
+    tab = _tab.get()
+    records = _records.get()
+    if records is not None:
+        records.append((name, tab, seconds, items))
+    if _enabled:
+        labels = (name, tab, batch_bucket(items))
+        _metrics.seconds.labels(*labels).observe(seconds)
+        if items:
+            _metrics.items.labels(*labels).inc(items)
+        if failed:
+            _metrics.errors.labels(*labels).inc()
+
+
+class _Stage:
+    __slots__ = ("name", "items", "start")
+
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start, self.items, failed=exc_type is not None)
+        return False
+
+
+def stage(name, items=None):
+    # with stage("predict", items=len(batch)): ...
+    if not _enabled and _records.get() is None:
+        return _NULL
+    return _Stage(name, items)
+
+
+def timed(name):
+    # Decorator form of stage() for whole functions (no item count)
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled and _records.get() is None:
+                return func(*args, **kwargs)
+            with _Stage(name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def tab(name):
+    # Label stages run inside the block with the tab (or caller) that ran them
+    token = _tab.set(name)
+    try:
+        yield
+    finally:
+        _tab.reset(token)
+
+
+@contextmanager
+def record():
+    # Collect (stage, tab, seconds, items) for every stage run inside the block
+    records = []
+    token = _records.set(records)
+    try:
+        yield records
+    finally:
+        _records.reset(token)
+
+
+def breakdown(records):
+    # Per-stage totals of record()'s output, slowest first
+    import pandas as pd
+
+    df = pd.DataFrame(records, columns=["Stage", "Tab", "Seconds", "Items"])
+    df["Items"] = pd.to_numeric(df["Items"]).fillna(0)
+    summary = df.groupby("Stage").agg(
+        Calls=("Seconds", "size"), Items=("Items", "sum"), Total_ms=("Seconds", "sum")
+    )
+    summary["Total_ms"] *= 1000
+    summary["Items"] = summary["Items"].astype("int64")
+    return summary.sort_values("Total_ms", ascending=False).rename(columns={"Total_ms": "Total ms"}).reset_index()
+
+
+def metrics_payload():
+    # (body, content type) of the Prometheus text exposition for a /metrics route
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port, addr="0.0.0.0"):
+    # Standalone /metrics endpoint on its own thread (prometheus_client.start_http_server)
+    from prometheus_client import start_http_server
+
+    enable()
+    start_http_server(port, addr=addr)
+
+
+@lru_cache(maxsize=None)
+def configure_from_env():
+    # Once per process: EV_PROFILE=1 enables metrics, EV_METRICS_PORT also serves them
+    port = os.environ.get("EV_METRICS_PORT")
+    if port:
+        start_metrics_server(int(port))
+    elif os.environ.get("EV_PROFILE", "").lower() in ("1", "true", "yes"):
+        enable()
@@ -1,62 +1,125 @@
+import warnings
+import numpy as np
 import pandas as pd
-from utils.sentiment import predict_numerical_score
+
+
+class AttributeRecommender:
+    # Model x attribute matrix of mean scores (1-5), min-max normalized per
+    # attribute once, so ranking for any set of weights is two matrix-vector
+    # products and an argpartition. Built per vehicle type from the aggregate
+    # index (see ReviewData.recommenders); rows are sorted by model name, which
+    # is also the tie-break, so equal inputs always give the same ranking.
+    # Models without data for a weighted attribute are not ranked.
+
+    def __init__(self, attribute_means):
+        attribute_means = attribute_means.sort_index()
+        self.model_names = attribute_means.index.to_numpy()
+        self.attributes = list(attribute_means.columns)
+        self.means = attribute_means.to_numpy(dtype=np.float64)
+
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            # All-NaN attributes (e.g. another vehicle type's) just stay unusable
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low = np.nanmin(self.means, axis=0, initial=np.inf)
+            high = np.nanmax(self.means, axis=0, initial=-np.inf)
+            span = high - low
+            # Attributes with one distinct value score 0.5 for every model, as before
+            normalized = np.where(span > 0, (self.means - low) / np.where(span > 0, span, 1), 0.5)
+        self.present = ~np.isnan(self.means)
+        self.normalized = np.where(self.present, normalized, 0.0)
+        self._means_filled = np.where(self.present, self.means, 0.0)
+
+    @classmethod
+    def from_index(cls, model_index, vehicle_type):
+        if vehicle_type not in model_index.attribute_means.index.get_level_values(0):
+            return cls(pd.DataFrame(columns=model_index.attribute_means.columns, dtype=float))
+        return cls(model_index.attribute_means.loc[vehicle_type])
+
+    def weight_vector(self, preferences):
+        # {attribute: weight} -> weights aligned with self.attributes. Unknown
+        # attributes and attributes no model has data for get weight 0.
+        weights = np.zeros(len(self.attributes))
+        for attribute, weight in preferences.items():
+            if attribute in self.attributes:
+                weights[self.attributes.index(attribute)] = weight
+        return np.where(self.present.any(axis=0), weights, 0.0)
+
+    def _weighted_mean(self, values, preferences):
+        # Per-model weighted mean; NaN for models missing any weighted attribute
+        weights = self.weight_vector(preferences)
+        total = weights.sum()
+        if total <= 0:
+            return np.full(len(self.model_names), np.nan)
+        complete = np.isclose(self.present @ weights, total)
+        return np.where(complete, (values @ weights) / total, np.nan)
+
+    def scores(self, preferences):
+        # Weighted mean of the normalized attribute scores (0-1)
+        return self._weighted_mean(self.normalized, preferences)
+
+    def ratings(self, preferences):
+        # Same weighting over the raw 1-5 means
+        return self._weighted_mean(self._means_filled, preferences)
+
+    def top_k(self, preferences, k=3):
+        # Best k models: Model_Name, Overall Score (0-1), Weighted Rating (1-5) and each attribute's mean
+        scores = self.scores(preferences)
+        keyed = np.where(np.isnan(scores), -np.inf, scores)
+        positions = _top_positions(keyed, k)
+        positions = positions[np.isfinite(keyed[positions])]
+
+        result = pd.DataFrame(self.means[positions], columns=self.attributes)
+        result.insert(0, "Model_Name", self.model_names[positions])
+        result.insert(1, "Overall Score", scores[positions])
+        result.insert(2, "Weighted Rating", self.ratings(preferences)[positions])
+        return result
+
+
+def _top_positions(values, k):
+    # Positions of the k largest values, best first; ties go to the lower position
+    k = min(k, len(values))
+    if k == 0:
+        return np.array([], dtype=int)
+    candidates = np.argpartition(-values, k - 1)[:k]
+    threshold = values[candidates].min()
+    above = np.flatnonzero(values > threshold)
+    tied = np.flatnonzero(values == threshold)[: k - len(above)]
+    candidates = np.concatenate([above, tied])
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
 
 def rank_models_by_preferences(df, preferences):
     attribute_cols = list(preferences.keys())
-    model_group = df.groupby("Model_Name")[attribute_cols].mean().reset_index()
-
-    # Normalize attributes 0-1
-    for col in attribute_cols:
-        min_val, max_val = model_group[col].min(), model_group[col].max()
-        if max_val != min_val:
-            model_group[col] = (model_group[col] - min_val) / (max_val - min_val)
-        else:
-            model_group[col] = 0.5
-
-    total_weight = sum(preferences.values())
-    model_group["Overall Score"] = sum(
-        model_group[attr] * weight for attr, weight in preferences.items()
-    ) / total_weight
-
-    return model_group.sort_values("Overall Score", ascending=False).reset_index(drop=True)
-
-def rank_models_by_textual_preferences(df, text_pref, attribute_cols, top_n=3):
-    # Simple keyword to attribute mapping 
-    keyword_map = {
-        "performance": "Performance",
-        "comfort": "Comfort",
-        "value": "Value for Money",
-        "mileage": "Mileage",
-        "design": "Design",
-        "battery": "Battery Life",
-        
-    }
-
-    # Convert input to lowercase, find matching attributes
-    text_lower = text_pref.lower()
-    selected_attrs = [attr for kw, attr in keyword_map.items() if kw in text_lower and attr in attribute_cols]
-
-    if not selected_attrs:
-        # fallback: use all attributes equally weighted
-        selected_attrs = attribute_cols
-
-    # Equal weights if none specified
-    preferences = {attr: 1 for attr in selected_attrs}
-
-    ranked = rank_models_by_preferences(df, preferences)
-
-    # Add sentiment scores averaged per model
-    sentiment_scores = df.groupby("Model_Name")["Review"].apply(
-        lambda reviews: reviews.apply(predict_numerical_score).mean()
-    ).reset_index().rename(columns={"Review": "Sentiment Score"})
-
-    # Merge sentiment with rankings
-    ranked = ranked.merge(sentiment_scores, on="Model_Name", how="left")
-    ranked["Sentiment Score"] = ranked["Sentiment Score"].fillna(ranked["Sentiment Score"].mean())
-
-    # Combine overall score and sentiment score with weights (example weights)
-    ranked["Combined Score"] = (ranked["Overall Score"] * 0.7) + (ranked["Sentiment Score"] / 5 * 0.3)
-
-    ranked = ranked.sort_values("Combined Score", ascending=False).reset_index(drop=True)
-
-    return ranked.head(top_n)
+    model_means = df.groupby("Model_Name", observed=True)[attribute_cols].mean()
+    recommender = AttributeRecommender(model_means)
+
+    model_group = pd.DataFrame(recommender.normalized, columns=recommender.attributes).where(recommender.present)
+    model_group.insert(0, "Model_Name", recommender.model_names)
+    model_group["Overall Score"] = recommender.scores(preferences)
+
+    return model_group.sort_values("Overall Score", ascending=False, kind="stable").reset_index(drop=True)
+
+# Share of review-language similarity (vs. mean predicted sentiment) in the textual ranking
+TEXT_SIMILARITY_WEIGHT = 0.7
+
+def rank_models_by_textual_preferences(similarity_index, text_pref, model_sentiment, top_n=3):
+    # Models whose reviews read most like text_pref, favouring well-reviewed ones.
+    # similarity_index: utils.similarity.ModelSimilarityIndex for one vehicle type
+    # model_sentiment: mean predicted score (1-5) per model name
+    similarity = similarity_index.similarities(text_pref)
+    best = similarity.max() if len(similarity) else 0
+    relevance = similarity / best if best > 0 else similarity
+
+    sentiment_scores = model_sentiment.reindex(similarity_index.model_names).to_numpy(dtype=float)
+    known = ~np.isnan(sentiment_scores)
+    fill = sentiment_scores[known].mean() if known.any() else 3.0
+    sentiment_scores = np.where(known, sentiment_scores, fill)
+
+    combined = TEXT_SIMILARITY_WEIGHT * relevance + (1 - TEXT_SIMILARITY_WEIGHT) * sentiment_scores / 5
+    positions = _top_positions(combined, top_n)
+    return pd.DataFrame({
+        "Model_Name": similarity_index.model_names[positions],
+        "Similarity": similarity[positions],
+        "Sentiment Score": sentiment_scores[positions],
+        "Combined Score": combined[positions],
+    })
@@ -1,29 +1,66 @@
 # Utils.sentiment.py
 # This module handles sentiment analysis using VADER and a pre-trained model.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 import numpy as np
-import pickle
-from nltk.sentiment import SentimentIntensityAnalyzer
-from utils.preprocessing import preprocess_text, lemmatize_text
+import pandas as pd
+import scipy.sparse as sp
+from utils.preprocessing import ensure_nltk_resources, normalize_texts
+from utils.cache import PredictionCache, review_key
+from utils import artifacts, profiling
 
-# Load VADER
-sia = SentimentIntensityAnalyzer()
+MODEL_PATH = 'models/lightgbm_model.pkl'
+VECTORIZER_PATH = 'models/vectorizer.pkl'
 
-# Load model/vectorizer ONCE globally for efficiency
-with open('models/lightgbm_model.pkl', 'rb') as f:
-    model = pickle.load(f)
+# Model, vectorizer, VADER and the prediction cache are lazy singletons:
+# loaded on first use (once per process) so importing this module stays cheap.
+@lru_cache(maxsize=None)
+def load_model_and_vectorizer():
+    # Prefer the compact export (python -m utils.artifacts export) when it was
+    # made from the current pickles; fall back to unpickling otherwise
+    if artifacts.is_current():
+        model, vectorizer = artifacts.load_artifacts()
+    else:
+        model, vectorizer = artifacts.load_pickles(MODEL_PATH, VECTORIZER_PATH)
 
-with open('models/vectorizer.pkl', 'rb') as f:
-    vectorizer = pickle.load(f)
+    # EV_COMPILED_TREES=1: small batches are scored by the NumPy tree walker in
+    # utils.trees - the server's micro-batches under light load and single-review
+    # predict_numerical_score / predict_review calls
+    if os.environ.get("EV_COMPILED_TREES", "").lower() in ("1", "true", "yes"):
+        from utils.trees import CompiledClassifier
 
-def predict_sentiment_label(review_text):
-    cleaned_text = preprocess_text(review_text)
-    lemmatized_text = lemmatize_text(cleaned_text)
-    tfidf_vector = vectorizer.transform([lemmatized_text]).toarray()
-    vader_score = sia.polarity_scores(lemmatized_text)['compound']
-    combined_vector = np.hstack((tfidf_vector, [[vader_score]]))
-    _ = model.predict(combined_vector)[0]
-    
-    # Use VADER only for label (for clarity)
+        model = CompiledClassifier(model)
+    return model, vectorizer
+
+@lru_cache(maxsize=None)
+def model_fingerprint():
+    # Fingerprint of the pickles behind the loaded model (the compact export is
+    # only used while it was made from them). Stored predictions - the prediction
+    # cache and the enriched store - are only trusted under the same fingerprint
+    from utils.cache import model_fingerprint as file_fingerprint
+
+    return file_fingerprint()
+
+@lru_cache(maxsize=None)
+def get_sia():
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    ensure_nltk_resources("vader_lexicon")
+    return SentimentIntensityAnalyzer()
+
+# Persistent prediction cache, invalidated when either pickle changes
+@lru_cache(maxsize=None)
+def get_prediction_cache():
+    return PredictionCache(fingerprint=model_fingerprint())
+
+# Reviews per vectorizer.transform / model.predict call in score_reviews
+BATCH_SIZE = 512
+
+# Reviews sent to a worker process per task in parallel mode (workers > 1)
+CHUNK_SIZE = 2048
+
+def _vader_label(vader_score):
     if vader_score >= 0.05:
         return "Positive"
     elif vader_score <= -0.05:
@@ -31,14 +68,166 @@ def predict_sentiment_label(review_text):
     else:
         return "Neutral"
 
+def lemmatize_reviews(texts):
+    texts = list(texts)
+    with profiling.stage("preprocess", items=len(texts)):
+        return normalize_texts(texts)
+
+def _vader_compounds(lemmatized):
+    sia = get_sia()
+    with profiling.stage("vader", items=len(lemmatized)):
+        return np.array([sia.polarity_scores(text)['compound'] for text in lemmatized])
+
+def model_features(tfidf_matrix, vader_scores, model):
+    # Booster input: the TF-IDF columns the model uses (all, unless it was pruned
+    # by `utils.artifacts export --prune`) and the VADER compound as the last column
+    term_columns = getattr(model, "term_columns", None)
+    if term_columns is not None:
+        tfidf_matrix = tfidf_matrix[:, term_columns]
+    # Keep the matrix sparse: VADER compound goes in as one extra CSR column,
+    # and LightGBM accepts CSR input directly.
+    return sp.hstack(
+        (tfidf_matrix, sp.csr_matrix(vader_scores[:, np.newaxis])), format="csr"
+    )
+
+def _featurize(lemmatized):
+    model, vectorizer = load_model_and_vectorizer()
+    with profiling.stage("vectorize", items=len(lemmatized)):
+        tfidf_matrix = vectorizer.transform(lemmatized)
+    vader_scores = _vader_compounds(lemmatized)
+    return model_features(tfidf_matrix, vader_scores, model), vader_scores
+
+def score_lemmatized(lemmatized, batch_size=BATCH_SIZE, labels_only=False):
+    # VADER compounds, labels and clipped model scores for already-lemmatized reviews.
+    # Each review is featurized once: the label comes from the same VADER compound
+    # that feeds the model. labels_only skips the TF-IDF transform and the booster
+    # (scores is None); the label does not depend on either.
+    if labels_only:
+        compounds = [float(v) for v in _vader_compounds(lemmatized)]
+        return compounds, [_vader_label(v) for v in compounds], None
+
+    model, _ = load_model_and_vectorizer()
+    compounds, labels, scores = [], [], []
+    for start in range(0, len(lemmatized), batch_size):
+        combined_matrix, vader_scores = _featurize(lemmatized[start:start + batch_size])
+        with profiling.stage("predict", items=combined_matrix.shape[0]):
+            predictions = model.predict(combined_matrix)
+
+        # Use VADER only for label (for clarity)
+        compounds.extend(float(v) for v in vader_scores)
+        labels.extend(_vader_label(v) for v in vader_scores)
+        scores.extend(int(s) for s in np.clip(predictions, 1, 5))
+    return compounds, labels, scores
+
+def _analyze_chunk(texts, batch_size=BATCH_SIZE, labels_only=False):
+    lemmatized = lemmatize_reviews(texts)
+    compounds, labels, scores = score_lemmatized(lemmatized, batch_size, labels_only)
+    return lemmatized, compounds, labels, scores
+
+def _init_worker():
+    # Runs once per worker process: the model, vectorizer and VADER are loaded
+    # there, never pickled per task
+    load_model_and_vectorizer()
+    get_sia()
+
+def analyze_reviews(texts, batch_size=BATCH_SIZE, workers=1, chunk_size=CHUNK_SIZE, labels_only=False):
+    # Lemmatized text, VADER compound, label and score for every review, in input order.
+    # workers > 1 (or None for all cores) splits the reviews across a process pool.
+    # labels_only: no TF-IDF / booster work, and scores is None.
+    texts = list(texts)
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(texts) <= chunk_size:
+        return _analyze_chunk(texts, batch_size, labels_only)
+
+    chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    lemmatized, compounds, labels, scores = [], [], [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        # map yields results in submission order, so output order matches input order
+        for part in pool.map(partial(_analyze_chunk, batch_size=batch_size, labels_only=labels_only), chunks):
+            lemmatized.extend(part[0])
+            compounds.extend(part[1])
+            labels.extend(part[2])
+            scores.extend(part[3] or [])
+    return lemmatized, compounds, labels, None if labels_only else scores
+
+def predict_reviews(texts, batch_size=BATCH_SIZE, workers=1, chunk_size=CHUNK_SIZE, labels_only=False):
+    # (VADER compounds, labels, clipped model scores) for every review, uncached
+    _, compounds, labels, scores = analyze_reviews(texts, batch_size, workers, chunk_size, labels_only)
+    return compounds, labels, scores
+
+def predict_review(review_text):
+    # (VADER compound, label, score) of one review from a single featurization
+    compounds, labels, scores = predict_reviews([review_text])
+    return compounds[0], labels[0], scores[0]
+
+def _score_uncached(texts, batch_size, workers=1, chunk_size=CHUNK_SIZE):
+    _, labels, scores = predict_reviews(texts, batch_size, workers, chunk_size)
+    return labels, scores
+
+def score_reviews(texts, batch_size=BATCH_SIZE, use_cache=True, workers=1, chunk_size=CHUNK_SIZE):
+    # Batch version of predict_sentiment_label + predict_numerical_score:
+    # one vectorizer transform and one model predict per chunk of reviews.
+    # Reviews already in the prediction cache are not scored again.
+    texts = list(texts)
+    if not use_cache:
+        return _score_uncached(texts, batch_size, workers, chunk_size)
+
+    prediction_cache = get_prediction_cache()
+    results = prediction_cache.get_many(texts)
+    missing = {}
+    for text, result in zip(texts, results):
+        if result is None:
+            missing.setdefault(review_key(text), text)
+
+    if missing:
+        labels, scores = _score_uncached(list(missing.values()), batch_size, workers, chunk_size)
+        fresh = dict(zip(missing.keys(), zip(labels, scores)))
+        prediction_cache.put_many(fresh)
+        results = [
+            result if result is not None else fresh[review_key(text)]
+            for text, result in zip(texts, results)
+        ]
+
+    labels = [label for label, _ in results]
+    scores = [score for _, score in results]
+    return labels, scores
+
+def label_reviews(texts, use_cache=True, workers=1, chunk_size=CHUNK_SIZE):
+    # Labels only: cached labels (from full predictions or earlier label-only
+    # runs) where present, VADER alone for the rest (no TF-IDF transform or
+    # booster predict). Fresh labels and compounds go to the cache's label table.
+    texts = list(texts)
+    if not use_cache:
+        return predict_reviews(texts, workers=workers, chunk_size=chunk_size, labels_only=True)[1]
+
+    prediction_cache = get_prediction_cache()
+    results = prediction_cache.get_labels(texts)
+    missing = {}
+    for text, result in zip(texts, results):
+        if result is None:
+            missing.setdefault(review_key(text), text)
+    fresh = {}
+    if missing:
+        compounds, labels, _ = predict_reviews(
+            list(missing.values()), workers=workers, chunk_size=chunk_size, labels_only=True
+        )
+        prediction_cache.put_labels(dict(zip(missing.keys(), zip(labels, compounds))))
+        fresh = dict(zip(missing.keys(), labels))
+    return [result if result is not None else fresh[review_key(text)] for text, result in zip(texts, results)]
+
+def predict_sentiment_label(review_text):
+    return label_reviews([review_text])[0]
+
 def predict_numerical_score(review_text):
-    cleaned_text = preprocess_text(review_text)
-    lemmatized_text = lemmatize_text(cleaned_text)
-    tfidf_vector = vectorizer.transform([lemmatized_text]).toarray()
-    vader_score = sia.polarity_scores(lemmatized_text)['compound']
-    combined_vector = np.hstack((tfidf_vector, [[vader_score]]))
-    score = model.predict(combined_vector)[0]
-    return int(np.clip(score, 1, 5))
+    _, scores = score_reviews([review_text])
+    return scores[0]
+
+def review_scores(df):
+    # Precomputed scores from the enriched store (utils.enrich) when available
+    if "Predicted Score" in df.columns:
+        return df["Predicted Score"].astype(float)
+    _, scores = score_reviews(df["Review"])
+    return pd.Series(scores, index=df.index, dtype=float)
 
 def sentiment_breakdown(predictions):
     sentiment_count = {"Positive": 0, "Neutral": 0, "Negative": 0}
@@ -47,7 +236,3 @@ def sentiment_breakdown(predictions):
             sentiment_count[p] += 1
     total = sum(sentiment_count.values()) or 1
     return {k: round(v / total, 3) for k, v in sentiment_count.items()}
-
-# ✅ Add this to allow external access from app.py
-def load_model_and_vectorizer():
-    return model, vectorizer
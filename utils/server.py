@@ -0,0 +1,193 @@
+# server.py
+# Headless HTTP scoring service around utils.sentiment, for callers other than
+# the Streamlit app. Concurrent requests are queued and merged into micro-batches
+# (up to --max-batch-size reviews, waiting at most --max-wait-ms for more to
+# arrive), so each batch pays for one vectorizer transform and one booster
+# predict. Inference runs on a single background thread: while one batch is
+# scored the next one fills up, so batches grow with load. /label requests have
+# their own batcher in label-only mode, which skips the TF-IDF transform and the
+# booster altogether.
+#
+#   python -m utils.server [--host 127.0.0.1] [--port 8765] [--max-batch-size 256] [--max-wait-ms 5]
+#
+#   POST /label    {"text": "..."} or {"texts": [...]}  -> {"labels": [...]}
+#   POST /score    same body                            -> {"scores": [...]}
+#   POST /predict  same body                            -> {"labels": [...], "scores": [...]}
+#   GET  /health                                        -> batch statistics
+#   GET  /metrics                                       -> Prometheus stage metrics (with --metrics)
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from utils import profiling, sentiment
+
+MAX_BATCH_SIZE = 256
+MAX_WAIT_MS = 5.0
+
+
+class MicroBatcher:
+    # Queue of (texts, future); a single consumer task drains it into batches
+
+    def __init__(self, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, use_cache=True, labels_only=False):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.use_cache = use_cache
+        self.labels_only = labels_only
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        self.batches = 0
+        self.reviews = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, texts):
+        # (labels, scores) for texts, scored together with whatever else is queued
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((list(texts), future))
+        return await future
+
+    def _score(self, texts):
+        with profiling.tab("server"):
+            if self.labels_only:
+                return sentiment.label_reviews(texts, use_cache=self.use_cache), [None] * len(texts)
+            return sentiment.score_reviews(texts, batch_size=max(len(texts), 1), use_cache=self.use_cache)
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        items = [await self.queue.get()]
+        size = len(items[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            items.append(item)
+            size += len(item[0])
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._next_batch()
+            texts = [text for item_texts, _ in items for text in item_texts]
+            try:
+                labels, scores = await loop.run_in_executor(self.executor, self._score, texts)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.reviews += len(texts)
+            start = 0
+            for item_texts, future in items:
+                stop = start + len(item_texts)
+                if not future.done():
+                    future.set_result((labels[start:stop], scores[start:stop]))
+                start = stop
+
+
+def _request_texts(body):
+    if isinstance(body, dict) and isinstance(body.get("text"), str):
+        return [body["text"]]
+    if isinstance(body, dict) and isinstance(body.get("texts"), list) and all(isinstance(t, str) for t in body["texts"]):
+        return body["texts"]
+    raise web.HTTPBadRequest(text='expected JSON {"text": "..."} or {"texts": ["...", ...]}')
+
+
+def _endpoint(fields, batcher="batcher"):
+    async def handler(request):
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="request body must be JSON")
+        texts = _request_texts(body)
+        labels, scores = await request.app[batcher].submit(texts)
+        result = {"labels": labels, "scores": scores}
+        return web.json_response({field: result[field] for field in fields})
+    return handler
+
+
+async def health(request):
+    batchers = [request.app["batcher"], request.app["label_batcher"]]
+    batches = sum(batcher.batches for batcher in batchers)
+    reviews = sum(batcher.reviews for batcher in batchers)
+    return web.json_response({
+        "status": "ok",
+        "uptime_s": round(time.monotonic() - request.app["started"], 1),
+        "batches": batches,
+        "reviews": reviews,
+        "mean_batch_size": round(reviews / batches, 2) if batches else 0,
+        "queued": sum(batcher.queue.qsize() for batcher in batchers),
+    })
+
+
+async def metrics(request):
+    body, content_type = profiling.metrics_payload()
+    return web.Response(body=body, headers={"Content-Type": content_type})
+
+
+def create_app(max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, use_cache=True, export_metrics=False):
+    app = web.Application()
+    app["started"] = time.monotonic()
+
+    async def on_startup(app):
+        app["batcher"] = MicroBatcher(max_batch_size, max_wait_ms, use_cache)
+        app["label_batcher"] = MicroBatcher(max_batch_size, max_wait_ms, use_cache, labels_only=True)
+        app["batcher"].start()
+        app["label_batcher"].start()
+        # Load the model, NLTK corpora and VADER before the first request instead
+        # of inside it (and before the two batcher threads can race to load them)
+        await asyncio.get_running_loop().run_in_executor(app["batcher"].executor, sentiment.predict_reviews, ["warm up"])
+
+    async def on_cleanup(app):
+        await app["batcher"].stop()
+        await app["label_batcher"].stop()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post("/label", _endpoint(["labels"], "label_batcher"))
+    app.router.add_post("/score", _endpoint(["scores"]))
+    app.router.add_post("/predict", _endpoint(["labels", "scores"]))
+    app.router.add_get("/health", health)
+    if export_metrics:
+        profiling.enable()
+        app.router.add_get("/metrics", metrics)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve review sentiment labels and scores over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE,
+                        help="most reviews scored in one batch")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS,
+                        help="longest a request waits for others to join its batch")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the prediction cache")
+    parser.add_argument("--metrics", action="store_true", help="time each stage and serve GET /metrics")
+    args = parser.parse_args(argv)
+
+    app = create_app(args.max_batch_size, args.max_wait_ms, use_cache=not args.no_cache, export_metrics=args.metrics)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
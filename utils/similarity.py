@@ -0,0 +1,190 @@
+# similarity.py
+# Retrieval index over the review corpus, in the sentiment model's own TF-IDF
+# space (the fitted vectorizer from utils.sentiment).
+#
+# ModelSimilarityIndex keeps one row per model: the sum of its reviews' TF-IDF
+# vectors, with the L2-normalized centroid derived from it. A free-text query is
+# ranked against every model with one sparse matrix-vector product. The sums and
+# review counts are additive, so ingested reviews merge in without a rebuild.
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from utils import sentiment
+
+
+def clean_reviews(df):
+    # Lemmatized review text: the enriched store's column, or computed
+    if "Clean Review" in df.columns:
+        return df["Clean Review"].fillna("").astype(str).tolist()
+    return sentiment.lemmatize_reviews(df["Review"])
+
+
+def query_vector(text):
+    # 1 x vocabulary TF-IDF row for a free-text query, normalized like the reviews
+    _, vectorizer = sentiment.load_model_and_vectorizer()
+    return vectorizer.transform(sentiment.lemmatize_reviews([text]))
+
+
+class ModelSimilarityIndex:
+
+    def __init__(self, model_names, sums, counts):
+        self.model_names = np.asarray(model_names, dtype=object)
+        self.sums = sp.csr_matrix(sums)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        # Row-normalized sums: same direction as the mean, unit length for cosine
+        norms = np.sqrt(np.asarray(self.sums.multiply(self.sums).sum(axis=1)).ravel())
+        self.centroids = sp.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ self.sums
+
+    def similarities(self, text):
+        # Cosine similarity of text to every model's review centroid
+        if not len(self.model_names):
+            return np.zeros(0)
+        return (self.centroids @ query_vector(text).T).toarray().ravel()
+
+    def merge(self, other):
+        # Index over the union of both review sets
+        names = np.union1d(self.model_names.astype(str), other.model_names.astype(str)).astype(object)
+        positions = {name: row for row, name in enumerate(names)}
+
+        def expand(index):
+            rows = np.array([positions[name] for name in index.model_names], dtype=np.int64)
+            mapping = sp.csr_matrix(
+                (np.ones(len(rows)), (rows, np.arange(len(rows)))), shape=(len(names), len(rows))
+            )
+            return mapping @ index.sums, np.bincount(rows, weights=index.counts, minlength=len(names))
+
+        sums, counts = expand(self)
+        other_sums, other_counts = expand(other)
+        return ModelSimilarityIndex(names, sums + other_sums, counts + other_counts)
+
+
+def review_vectors(df):
+    # (reviewed rows, their TF-IDF matrix): rows with review text and a model
+    # name, vectorized with the sentiment model's vectorizer (L2-normalized rows)
+    df = df.dropna(subset=["Review", "Model_Name"])
+    _, vectorizer = sentiment.load_model_and_vectorizer()
+    return df, vectorizer.transform(clean_reviews(df))
+
+
+def build_similarity_index(df, vectors=None):
+    # df: review frame of one vehicle type; vectors: its review_vectors, if already computed
+    df, tfidf = vectors if vectors is not None else review_vectors(df)
+
+    codes, names = pd.factorize(df["Model_Name"].astype(str), sort=True)
+    # models x reviews indicator, so one product sums every model's review vectors
+    membership = sp.csr_matrix(
+        (np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(len(names), len(codes))
+    )
+    return ModelSimilarityIndex(names.to_numpy(dtype=object), membership @ tfidf, np.bincount(codes, minlength=len(names)))
+
+
+class ReviewSearchIndex:
+    # Nearest-neighbour search over individual reviews. Rows are the reviews'
+    # unit-length TF-IDF vectors, sorted by (vehicle type, model) so every filter
+    # is one contiguous row range (a model across vehicle types is one per type),
+    # and stored column-wise: each column is a term's posting list, sorted by row,
+    # so a query only touches the postings of its own terms inside those ranges.
+
+    def __init__(self, frames, vectors):
+        # frames: {vehicle type: reviewed rows}; vectors: {vehicle type: their TF-IDF rows}
+        vehicle_types, model_names, rows, matrices = [], [], [], []
+        for vehicle_type, df in frames.items():
+            vehicle_types.append(np.full(len(df), vehicle_type, dtype=object))
+            model_names.append(df["Model_Name"].astype(str).to_numpy(dtype=object))
+            rows.append(np.arange(len(df)))
+            matrices.append(sp.csr_matrix(vectors[vehicle_type], dtype=np.float32))
+
+        vehicle_types = np.concatenate(vehicle_types) if vehicle_types else np.array([], dtype=object)
+        model_names = np.concatenate(model_names) if model_names else np.array([], dtype=object)
+        order = np.lexsort((model_names.astype(str), vehicle_types.astype(str)))
+        self.frames = frames
+        self.vehicle_types = vehicle_types[order]
+        self.model_names = model_names[order]
+        self.rows = np.concatenate(rows)[order] if rows else np.array([], dtype=np.int64)
+        self.postings = sp.vstack(matrices, format="csr")[order].tocsc() if matrices else sp.csc_matrix((0, 0))
+        self.postings.sort_indices()
+
+        # (vehicle type, model) -> row ranges, with None for "any"
+        self._ranges = {(None, None): [(0, len(self.rows))]}
+        for key, row_range in _key_ranges(self.vehicle_types, lambda position: (self.vehicle_types[position], None)).items():
+            self._ranges[key] = [row_range]
+        model_keys = self.vehicle_types + "\x1f" + self.model_names
+        for key, row_range in _key_ranges(model_keys, lambda position: (self.vehicle_types[position], self.model_names[position])).items():
+            self._ranges[key] = [row_range]
+            self._ranges.setdefault((None, key[1]), []).append(row_range)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def scores(self, text):
+        # Cosine similarity of text to every review, in index order
+        if not len(self):
+            return np.zeros(0, dtype=np.float32)
+        query = query_vector(text).tocsr()
+        if query.nnz == 0:
+            return np.zeros(len(self), dtype=np.float32)
+        return self.postings[:, query.indices] @ query.data.astype(np.float32)
+
+    def _range_scores(self, query, start, stop):
+        # Cosine similarity of a query row to the reviews in [start, stop): each
+        # term's postings are cut to the range by binary search before scoring
+        scores = np.zeros(stop - start, dtype=np.float32)
+        indptr, indices, data = self.postings.indptr, self.postings.indices, self.postings.data
+        for term, weight in zip(query.indices, query.data.astype(np.float32)):
+            postings = slice(indptr[term], indptr[term + 1])
+            first, last = np.searchsorted(indices[postings], [start, stop]) + indptr[term]
+            scores[indices[first:last] - start] += weight * data[first:last]
+        return scores
+
+    def search(self, text, k=10, vehicle_type=None, model_name=None):
+        # Top-k reviews most similar to text, optionally within one vehicle type
+        # and/or model (a model alone matches it in every vehicle type):
+        # Vehicle_Type, Model_Name, Similarity, then the review's columns
+        ranges = self._ranges.get((vehicle_type, model_name), [])
+        candidates = np.concatenate([np.arange(start, stop) for start, stop in ranges] or [np.zeros(0, dtype=np.int64)])
+        scores = np.zeros(len(candidates), dtype=np.float32)
+        if len(candidates):
+            query = query_vector(text).tocsr()
+            scores = np.concatenate([self._range_scores(query, start, stop) for start, stop in ranges])
+        best = _top_k(scores, min(k, len(scores)))
+        best = best[scores[best] > 0]
+
+        results = []
+        for position, score in zip(candidates[best], scores[best]):
+            vehicle_type_key = self.vehicle_types[position]
+            review = self.frames[vehicle_type_key].iloc[self.rows[position]]
+            results.append({
+                "Vehicle_Type": vehicle_type_key,
+                "Model_Name": self.model_names[position],
+                "Similarity": float(score),
+                "Review": review["Review"],
+                "Predicted Sentiment": review.get("Predicted Sentiment"),
+                "Rating": review.get("Rating"),
+            })
+        return pd.DataFrame(results, columns=["Vehicle_Type", "Model_Name", "Similarity", "Review", "Predicted Sentiment", "Rating"])
+
+
+def _key_ranges(keys, scope_of):
+    # {scope_of(first position): (start, stop)} for each run of equal values in sorted keys
+    if not len(keys):
+        return {}
+    change = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts, stops = np.r_[0, change], np.r_[change, len(keys)]
+    return {scope_of(start): (start, stop) for start, stop in zip(starts, stops)}
+
+
+def _top_k(scores, k):
+    # Positions of the k highest scores, best first
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def build_search_index(frames, vectors=None):
+    # frames: {vehicle type: review frame}; vectors: {vehicle type: review_vectors(frame)}
+    vectors = vectors or {vehicle_type: review_vectors(df) for vehicle_type, df in frames.items()}
+    return ReviewSearchIndex(
+        {vehicle_type: reviewed for vehicle_type, (reviewed, _) in vectors.items()},
+        {vehicle_type: tfidf for vehicle_type, (_, tfidf) in vectors.items()},
+    )
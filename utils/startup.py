@@ -0,0 +1,48 @@
+# startup.py
+# Cold-start measurement: each step runs in a fresh interpreter so module
+# caches and already-imported libraries don't hide the real cost.
+#
+#   python -m utils.startup
+import subprocess
+import sys
+
+# (label, setup code, timed code)
+STEPS = [
+    ("import utils.data_loader", "", "import utils.data_loader"),
+    ("import utils.preprocessing", "", "import utils.preprocessing"),
+    ("import utils.sentiment", "", "import utils.sentiment"),
+    ("import tabs.attribute_tab", "", "import tabs.attribute_tab"),
+    ("import app", "", "import app"),
+    ("load model + vectorizer", "import utils.sentiment as s", "s.load_model_and_vectorizer()"),
+    ("first review scored", "import utils.sentiment as s", "s.score_reviews(['Great range and smooth ride'], use_cache=False)"),
+]
+
+_TEMPLATE = """
+import time
+{setup}
+start = time.perf_counter()
+{timed}
+print(time.perf_counter() - start)
+"""
+
+
+def time_step(setup, timed):
+    result = subprocess.run(
+        [sys.executable, "-c", _TEMPLATE.format(setup=setup, timed=timed)],
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    for label, setup, timed in STEPS:
+        try:
+            seconds = time_step(setup, timed)
+            print(f"{label:<32} {seconds * 1000:9.1f} ms")
+        except subprocess.CalledProcessError as e:
+            errors = [line for line in e.stderr.splitlines() if "Error" in line]
+            print(f"{label:<32}    failed: {(errors or ['?'])[-1].strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# synthetic.py
+# Synthetic review corpora at N x the size of the bundled CSVs, in the exact
+# column layout of each source, for benchmarking (see utils.benchmark).
+#
+# Rows are resampled from the real data: review text, model and rating are drawn
+# together from one real row, and each review gets a sentence from another review
+# appended, so texts are realistic but (almost) never exact duplicates. The other
+# columns are drawn independently from their observed values, missing values
+# included. Above 1x, models are split into int(sqrt(scale)) variants so the
+# number of distinct models grows with the corpus as well.
+#
+#   python -m utils.synthetic --scale 100 [--output-dir .cache/synthetic/100x] [--seed 0]
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from utils.data_loader import SOURCE_FILES, SOURCE_SCHEMAS
+
+SYNTHETIC_DIR = os.path.join(".cache", "synthetic")
+
+# Drawn together from the same real row
+_JOINT_COLUMNS = {"Review", "Model_Name", "rating", "Rating"}
+
+
+def _sentences(reviews):
+    sentences = reviews.dropna().astype(str).str.split(r"(?<=[.!?])\s+", regex=True).explode()
+    sentences = sentences[sentences.str.len() > 20]
+    return sentences.to_numpy(dtype=object)
+
+
+def generate_source(source, rows, scale=1, seed=0, real=None):
+    # rows synthetic reviews in the raw CSV layout of source
+    real = real if real is not None else pd.read_csv(SOURCE_FILES[source])
+    rng = np.random.default_rng(seed)
+
+    base = rng.integers(0, len(real), rows)
+    synthetic = {}
+    for col in real.columns:
+        values = real[col].to_numpy(dtype=object)
+        synthetic[col] = values[base] if col in _JOINT_COLUMNS else values[rng.integers(0, len(real), rows)]
+
+    sentences = _sentences(real["Review"])
+    reviews = pd.Series(synthetic["Review"], dtype=object)
+    extra = pd.Series(sentences[rng.integers(0, len(sentences), rows)], dtype=object)
+    synthetic["Review"] = reviews.where(reviews.isna(), reviews.astype(str) + " " + extra).to_numpy(dtype=object)
+
+    variants = int(np.sqrt(scale))
+    if variants > 1:
+        models = pd.Series(synthetic["Model_Name"], dtype=object)
+        suffix = pd.Series(rng.integers(0, variants, rows)).map(lambda v: "" if v == 0 else f" S{v}")
+        synthetic["Model_Name"] = models.where(models.isna(), models.astype(str) + suffix).to_numpy(dtype=object)
+
+    df = pd.DataFrame(synthetic, columns=real.columns)
+    # Keep numeric columns numeric so the CSV round-trips like the real one
+    for col, kind in SOURCE_SCHEMAS[source].items():
+        if kind == "score" and col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def corpus_dir(scale, root=SYNTHETIC_DIR):
+    return os.path.join(root, f"{scale}x")
+
+
+def write_corpus(scale, output_dir=None, seed=0):
+    # {source: csv path} of a corpus scale x the bundled one; 1x is the bundled CSVs themselves.
+    # Files already generated for this scale are reused.
+    if scale == 1:
+        return dict(SOURCE_FILES)
+
+    output_dir = output_dir or corpus_dir(scale)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for offset, (source, path) in enumerate(SOURCE_FILES.items()):
+        paths[source] = os.path.join(output_dir, os.path.basename(path))
+        if not os.path.exists(paths[source]):
+            real = pd.read_csv(path)
+            df = generate_source(source, len(real) * scale, scale=scale, seed=seed + offset, real=real)
+            df.to_csv(paths[source] + ".tmp", index=False)
+            os.replace(paths[source] + ".tmp", paths[source])
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic review corpus N x the bundled CSVs.")
+    parser.add_argument("--scale", type=int, required=True)
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for source, path in write_corpus(args.scale, args.output_dir, args.seed).items():
+        print(f"{source}: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# trees.py
+# LightGBM tree ensemble compiled into flat NumPy arrays, for low-latency scoring
+# of one or a few reviews. LightGBM's predict has a fixed per-call cost (input
+# conversion, thread setup) that dominates when the input is a single row; here
+# every tree is walked at once, one tree level per step, over a rows x trees grid.
+#
+# The arrays are parsed from the booster's text model, so thresholds and leaf
+# values are the exact doubles LightGBM uses; class scores match its predict to
+# within floating-point summation order (~1e-12). Numerical splits only.
+#
+# Opt in with EV_COMPILED_TREES=1: batches of up to COMPILED_MAX_ROWS reviews are
+# then scored here and larger ones still go to the (multi-threaded) booster.
+#
+#   python -m utils.trees [--batch-sizes 1,4,16,64,256] [--repeat 200]
+import argparse
+import re
+import time
+import numpy as np
+
+# Batches above this go to LightGBM, whose per-row cost is lower once its
+# fixed per-call overhead is amortized (crossover measured at ~16 rows)
+COMPILED_MAX_ROWS = 8
+
+# Rows of the dense, NaN-laden input in the CLI's parity check
+PARITY_DENSE_ROWS = 64
+
+# Padded-node budget (trees x 2^depth); deeper ensembles stay on LightGBM
+MAX_COMPILED_NODES = 1 << 24
+
+# LightGBM treats |x| <= kZeroThreshold as zero for missing_type=Zero
+ZERO_THRESHOLD = 1e-35
+
+# decision_type bit layout (LightGBM tree.h)
+_CATEGORICAL_MASK = 1
+_DEFAULT_LEFT_MASK = 2
+_MISSING_ZERO, _MISSING_NAN = 1, 2
+
+
+def _numbers(block, key, dtype):
+    match = re.search(rf"^{key}=(.*)$", block, flags=re.M)
+    return np.array(match.group(1).split(), dtype=dtype) if match and match.group(1) else np.array([], dtype=dtype)
+
+
+class CompiledEnsemble:
+    # Every tree padded to a complete binary tree of the ensemble's depth D and
+    # stored heap-style (children of node i at 2i+1 / 2i+2): feature, threshold,
+    # default_left and missing_type are trees x (2^D - 1) arrays, leaf_values is
+    # trees x 2^D. A leaf above depth D becomes pass-through nodes (threshold +inf,
+    # always left) ending in a copy of its value, so every row takes exactly D
+    # steps through every tree with no per-node branching.
+
+    def __init__(self, model_string):
+        header = model_string[:model_string.index("Tree=0\n")]
+        fields = dict(line.split("=", 1) for line in header.splitlines() if "=" in line)
+        self.num_class = int(fields["num_class"])
+        self.num_features = int(fields["max_feature_idx"]) + 1
+        objective = fields["objective"].split()
+        self.objective = objective[0]
+        self.sigmoid = float(dict(param.split(":", 1) for param in objective[1:] if ":" in param).get("sigmoid", 1.0))
+        if self.objective not in ("multiclass", "multiclassova", "binary") and not self.objective.startswith("regression"):
+            raise ValueError(f"objective {self.objective!r} cannot be compiled")
+
+        trees_text = model_string[model_string.index("Tree=0\n"):model_string.index("end of trees")]
+        trees = [_parse_tree(block) for block in re.split(r"(?m)^(?=Tree=\d+\n)", trees_text) if block]
+        self.depth = max(_depth(tree) for tree in trees)
+        if len(trees) << self.depth > MAX_COMPILED_NODES:
+            raise ValueError(f"{len(trees)} trees of depth {self.depth} are too large to compile")
+
+        internal, width = (1 << self.depth) - 1, 1 << self.depth
+        self.feature = np.zeros((len(trees), internal), dtype=np.int32)
+        self.threshold = np.full((len(trees), internal), np.inf)
+        self.default_left = np.ones((len(trees), internal), dtype=bool)
+        self.missing_type = np.zeros((len(trees), internal), dtype=np.int8)
+        self.leaf_values = np.zeros((len(trees), width))
+        for index, tree in enumerate(trees):
+            self._place(index, tree)
+        self.has_missing = bool(self.missing_type.any())
+
+        # Flat views for gathers: node (tree t, heap position i) is t * internal + i
+        self.tree_offsets = np.arange(len(trees), dtype=np.intp) * internal
+        self.leaf_offsets = np.arange(len(trees), dtype=np.intp) * width - internal
+        self._feature, self._threshold = self.feature.ravel(), self.threshold.ravel()
+        self._default_left, self._missing_type = self.default_left.ravel(), self.missing_type.ravel()
+        self._leaf_values = self.leaf_values.ravel()
+        self.num_nodes = len(self._feature)
+
+        # Sparse rows are mostly zeros: every node's decision for a zero value is
+        # fixed, and only the nodes splitting on a row's nonzero features need
+        # evaluating. Real split nodes grouped by feature (pass-through nodes never
+        # go right, whatever the value).
+        self.zero_right = self._go_right(np.zeros(self.num_nodes), np.arange(self.num_nodes))
+        split_nodes = np.flatnonzero(np.isfinite(self._threshold))
+        order = np.argsort(self._feature[split_nodes], kind="stable")
+        self.nodes_by_feature = split_nodes[order]
+        self.feature_ptr = np.searchsorted(self._feature[self.nodes_by_feature], np.arange(self.num_features + 1))
+
+    def _place(self, index, tree):
+        # Copy one parsed tree into row `index` of the padded arrays
+        split_feature, threshold, decision_type, left, right, leaf_value = tree
+        stack = [(0 if len(split_feature) else ~0, 0, 0)]  # (local node, heap position, depth)
+        while stack:
+            node, position, depth = stack.pop()
+            if node >= 0:
+                self.feature[index, position] = split_feature[node]
+                self.threshold[index, position] = threshold[node]
+                self.default_left[index, position] = bool(decision_type[node] & _DEFAULT_LEFT_MASK)
+                self.missing_type[index, position] = (decision_type[node] >> 2) & 3
+                stack.append((left[node], 2 * position + 1, depth + 1))
+                stack.append((right[node], 2 * position + 2, depth + 1))
+            else:
+                # Leaf: pass-through nodes below it all go left, so its value only
+                # needs to sit in the leftmost bottom slot of its subtree
+                bottom = ((position + 1) << (self.depth - depth)) - 1
+                self.leaf_values[index, bottom - ((1 << self.depth) - 1)] = leaf_value[~node]
+
+    @classmethod
+    def from_booster(cls, booster):
+        return cls(booster.model_to_string())
+
+    def _go_right(self, values, nodes):
+        # LightGBM's NumericalDecision, vectorized over (row, tree) pairs. NaN is
+        # compared as 0.0 unless the node's missing type is NaN
+        if not self.has_missing:
+            return np.where(np.isnan(values), 0.0, values) > self._threshold[nodes]
+        missing_type = self._missing_type[nodes]
+        nan = np.isnan(values)
+        values = np.where(nan & (missing_type != _MISSING_NAN), 0.0, values)
+        missing = ((missing_type == _MISSING_ZERO) & (np.abs(values) <= ZERO_THRESHOLD)) | (
+            (missing_type == _MISSING_NAN) & nan
+        )
+        return np.where(missing, ~self._default_left[nodes], values > self._threshold[nodes])
+
+    def _decisions(self, X):
+        # Flat rows x nodes "go right" flags for CSR rows X: the zero-value
+        # decisions, overwritten for the nodes splitting on each row's stored features
+        n_rows = X.shape[0]
+        go_right = np.tile(self.zero_right, n_rows)
+        starts, stops = self.feature_ptr[X.indices], self.feature_ptr[X.indices + 1]
+        counts = stops - starts
+        total = int(counts.sum())
+        if total:
+            entries = np.repeat(np.arange(len(X.indices)), counts)
+            # Position of each repeated entry within its feature's node list
+            within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            nodes = self.nodes_by_feature[starts[entries] + within]
+            rows = np.repeat(np.arange(n_rows), np.diff(X.indptr))[entries]
+            go_right[rows * self.num_nodes + nodes] = self._go_right(X.data[entries].astype(np.float64), nodes)
+        return go_right
+
+    def _predict_block(self, X):
+        go_right = self._decisions(X)
+        n_rows = X.shape[0]
+        base = (np.arange(n_rows, dtype=np.intp) * self.num_nodes)[:, np.newaxis] + self.tree_offsets
+        position = np.zeros(base.shape, dtype=np.intp)
+        index = np.empty_like(position)
+        # Heap walk: child of i is 2i+1 (left) or 2i+2 (right), D steps for every tree
+        for _ in range(self.depth):
+            np.add(base, position, out=index)
+            position *= 2
+            position += 1
+            position += go_right[index]
+        outputs = self._leaf_values[position + self.leaf_offsets]
+        return outputs.reshape(n_rows, -1, self.num_class).sum(axis=1)
+
+    def predict_raw(self, X, block_rows=64):
+        # rows x classes raw scores (sum of each class's tree outputs); X is read
+        # as CSR, so TF-IDF rows are used as they are, without densifying
+        import scipy.sparse as sp
+
+        if not sp.issparse(X) or X.format != "csr":
+            X = sp.csr_matrix(X)
+        if not X.has_canonical_format:
+            X = X.copy()
+            X.sum_duplicates()
+        if X.shape[0] <= block_rows:
+            return self._predict_block(X)
+        return np.concatenate([
+            self._predict_block(X[start:start + block_rows]) for start in range(0, X.shape[0], block_rows)
+        ])
+
+    def predict(self, X):
+        # Same output as Booster.predict: class probabilities (multiclass / binary) or raw values
+        raw = self.predict_raw(X)
+        if self.objective == "multiclass":
+            exp = np.exp(raw - raw.max(axis=1, keepdims=True))
+            return exp / exp.sum(axis=1, keepdims=True)
+        if self.objective in ("binary", "multiclassova"):
+            raw = 1.0 / (1.0 + np.exp(-self.sigmoid * raw))
+        return raw[:, 0] if self.num_class == 1 else raw
+
+
+def _parse_tree(block):
+    # (split_feature, threshold, decision_type, left_child, right_child, leaf_value) of one text-model tree
+    if int(re.search(r"^num_cat=(\d+)$", block, flags=re.M).group(1)) or "is_linear=1" in block:
+        raise ValueError("only numerical splits in non-linear trees can be compiled")
+    decision_type = _numbers(block, "decision_type", np.int8)
+    if (decision_type & _CATEGORICAL_MASK).any():
+        raise ValueError("only numerical splits can be compiled")
+    return (
+        _numbers(block, "split_feature", np.int32),
+        _numbers(block, "threshold", np.float64),
+        decision_type,
+        _numbers(block, "left_child", np.int32),
+        _numbers(block, "right_child", np.int32),
+        _numbers(block, "leaf_value", np.float64),
+    )
+
+
+def _depth(tree):
+    # Longest root-to-leaf path, in splits
+    left, right = tree[3], tree[4]
+    if not len(left):
+        return 0
+    depth, stack = 0, [(0, 1)]
+    while stack:
+        node, level = stack.pop()
+        depth = max(depth, level)
+        stack.extend((child, level + 1) for child in (left[node], right[node]) if child >= 0)
+    return depth
+
+
+class CompiledClassifier:
+    # Drop-in for the classifier sentiment uses (predict, classes_, booster_,
+    # term_columns): small batches through the compiled trees, the rest through
+    # the wrapped model
+
+    def __init__(self, model, max_rows=COMPILED_MAX_ROWS):
+        self.model = model
+        self.booster_ = model.booster_
+        self.classes_ = np.asarray(model.classes_)
+        self.term_columns = getattr(model, "term_columns", None)
+        self.ensemble = CompiledEnsemble.from_booster(model.booster_)
+        self.max_rows = max_rows
+
+    def predict(self, X):
+        if X.shape[0] > self.max_rows:
+            return self.model.predict(X)
+        proba = self.ensemble.predict(X)
+        if proba.ndim == 1:
+            return self.classes_[(proba > 0.5).astype(int)]
+        return self.classes_[np.argmax(proba, axis=1)]
+
+
+def _time(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return np.percentile(durations, 50), np.percentile(durations, 95)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare compiled-tree and LightGBM predict latency.")
+    parser.add_argument("--batch-sizes", default="1,4,16,64,256")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from utils import sentiment
+    from utils.data_loader import SOURCE_FILES
+
+    model, vectorizer = sentiment.load_model_and_vectorizer()
+    model = getattr(model, "model", model)  # the stock classifier, even with EV_COMPILED_TREES set
+    booster = model.booster_
+    start = time.perf_counter()
+    ensemble = CompiledEnsemble.from_booster(booster)
+    print(f"compiled {len(ensemble.tree_offsets)} trees of depth {ensemble.depth} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    reviews = pd.concat([pd.read_csv(path)["Review"] for path in SOURCE_FILES.values()], ignore_index=True)
+    lemmatized = sentiment.lemmatize_reviews(reviews)
+    vader_scores = np.array([sentiment.get_sia().polarity_scores(text)["compound"] for text in lemmatized])
+    features = sentiment.model_features(vectorizer.transform(lemmatized), vader_scores, model)
+
+    compiled, stock = ensemble.predict(features), booster.predict(features)
+    label_mismatches = int((np.argmax(compiled, axis=1) != np.argmax(stock, axis=1)).sum()) if compiled.ndim > 1 else 0
+    print(
+        f"{features.shape[0]} reviews: max |compiled - booster| = {np.abs(compiled - stock).max():.2e},"
+        f" {label_mismatches} labels differ"
+    )
+
+    # Dense input with missing values: NaN in a tenth of the cells, split features included
+    dense = features[:PARITY_DENSE_ROWS].toarray()
+    dense[np.random.default_rng(0).random(dense.shape) < 0.1] = np.nan
+    raw_difference = np.abs(ensemble.predict_raw(dense) - booster.predict(dense, raw_score=True).reshape(len(dense), -1))
+    print(f"{len(dense)} dense rows with NaN: max |compiled - booster| raw score = {raw_difference.max():.2e}")
+
+    # model.predict is what utils.sentiment calls; booster.predict is LightGBM without the wrapper
+    print(f"{'batch':>6} {'model.predict ms':>17} {'booster.predict ms':>19} {'compiled ms':>12} {'p95':>8} {'vs model':>9}")
+    for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+        batch = features[:batch_size]
+        model_p50, _ = _time(lambda: model.predict(batch), args.repeat)
+        booster_p50, _ = _time(lambda: booster.predict(batch), args.repeat)
+        compiled_p50, compiled_p95 = _time(lambda: ensemble.predict(batch), args.repeat)
+        print(
+            f"{batch_size:>6} {model_p50 * 1000:>17.3f} {booster_p50 * 1000:>19.3f}"
+            f" {compiled_p50 * 1000:>12.3f} {compiled_p95 * 1000:>8.3f} {model_p50 / compiled_p50:>8.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
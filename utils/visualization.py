@@ -1,8 +1,9 @@
-import matplotlib.pyplot as plt
 from wordcloud import WordCloud
 import plotly.graph_objects as go
 import plotly.express as px
+import numpy as np
 import pandas as pd
+from utils import profiling
 
 
 
@@ -14,6 +15,7 @@ sentiment_colors = {
 }
 
 # PIE CHART
+@profiling.timed("figure.plot_sentiment_pie")
 def plot_sentiment_pie(df):
     sentiment_counts = df["Predicted Sentiment"].value_counts()
     fig = go.Figure(data=[go.Pie(
@@ -30,25 +32,41 @@ def plot_sentiment_pie(df):
     )
     return fig
 
-# WORD CLOUD (filtered)
-def plot_wordcloud(df, sentiment=None):
-    if sentiment:
-        df = df[df['Predicted Sentiment'] == sentiment]
+# WORD CLOUD (from precomputed word frequencies, see utils.wordfreq)
+# Rendered images are kept per filter key, so flipping back to a selection
+# already shown costs a dict lookup (cached_wordcloud, checked before any
+# frequencies are counted)
+WORDCLOUD_CACHE_SIZE = 128
+_wordcloud_images = {}
 
-    text = " ".join(df["Review"].astype(str).values)
-    if not text.strip():
-        text = "No words to show"
+def cached_wordcloud(key):
+    # Image plot_wordcloud rendered under key, None if not (or no longer) cached
+    return _wordcloud_images.get(key)
+
+@profiling.timed("figure.plot_wordcloud")
+def plot_wordcloud(frequencies, key=None):
+    # RGB image array for {word: count}; key must change whenever frequencies
+    # can (the data version and the model fingerprint, which the labels come
+    # from), None skips the cache
+    if key is not None and key in _wordcloud_images:
+        return _wordcloud_images[key]
+
+    if not frequencies:
+        frequencies = {"No": 1, "words": 1, "show": 1}
 
     wordcloud = WordCloud(
         width=800, height=400, background_color='white'
-    ).generate(text)
+    ).generate_from_frequencies(frequencies)
+    image = wordcloud.to_array()
 
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.imshow(wordcloud, interpolation="bilinear")
-    ax.axis("off")
-    return fig
+    if key is not None:
+        if len(_wordcloud_images) >= WORDCLOUD_CACHE_SIZE:
+            _wordcloud_images.pop(next(iter(_wordcloud_images)))
+        _wordcloud_images[key] = image
+    return image
 
 # BAR CHART
+@profiling.timed("figure.plot_sentiment_bar")
 def plot_sentiment_bar(df, filtered_sentiment=None):
     if filtered_sentiment:
         df = df[df["Predicted Sentiment"] == filtered_sentiment]
@@ -67,23 +85,100 @@ def plot_sentiment_bar(df, filtered_sentiment=None):
     return fig
 
 # SCATTER PLOT
-def plot_sentiment_scatter(df, filtered_sentiment=None):
-    df["Review Length"] = df["Review"].astype(str).apply(len)
+# The payload stays bounded whatever the corpus size: above
+# SCATTER_WEBGL_THRESHOLD points the markers are drawn with WebGL, above the
+# point budget a stratified sample (per sentiment) is drawn, and mode="density"
+# replaces the markers with server-side (sentiment x length bin) counts.
+SCATTER_WEBGL_THRESHOLD = 1000
+SCATTER_POINT_BUDGET = 5000
+SCATTER_LENGTH_BINS = 60
+HOVER_CHARS = 200
+
+def review_lengths(df):
+    # Character count per review, without touching df; the enriched store has it precomputed
+    if "Review Length" in df.columns:
+        return df["Review Length"]
+    reviews = df["Review"]
+    if reviews.dtype == object:
+        reviews = reviews.astype(str)
+    return reviews.str.len()
+
+def truncate_text(texts, max_chars=HOVER_CHARS):
+    texts = texts.astype(str)
+    short = texts.str.slice(0, max_chars)
+    return short.where(texts.str.len() <= max_chars, short + "…")
+
+def stratified_sample(df, column, max_rows, random_state=0):
+    # At most ~max_rows rows, each value of column keeping its share (and at least one row)
+    if len(df) <= max_rows:
+        return df
+    fraction = max_rows / len(df)
+    rng = np.random.default_rng(random_state)
+    keep = [
+        rng.choice(positions, size=max(1, round(len(positions) * fraction)), replace=False)
+        for positions in df.groupby(column, observed=True).indices.values()
+    ]
+    return df.iloc[np.sort(np.concatenate(keep))]
+
+@profiling.timed("figure.plot_sentiment_scatter")
+def plot_sentiment_scatter(df, filtered_sentiment=None, max_points=SCATTER_POINT_BUDGET, mode="points"):
     if filtered_sentiment:
         df = df[df["Predicted Sentiment"] == filtered_sentiment]
 
+    plot_df = pd.DataFrame({
+        "Review Length": review_lengths(df),
+        "Predicted Sentiment": df["Predicted Sentiment"].astype(str),
+        "Review": df["Review"],
+    })
+    total = len(plot_df)
+    if mode == "density":
+        return _plot_length_density(plot_df)
+
+    plot_df = stratified_sample(plot_df, "Predicted Sentiment", max_points)
+    plot_df["Review"] = truncate_text(plot_df["Review"])
+
+    title = "Review Length vs Predicted Sentiment"
+    if len(plot_df) < total:
+        title += f" ({len(plot_df):,} of {total:,} reviews, sampled per sentiment)"
+
     fig = px.scatter(
-        df,
+        plot_df,
         x="Review Length",
         y="Predicted Sentiment",
         color="Predicted Sentiment",
         color_discrete_map=sentiment_colors,
         hover_data=["Review"],
-        title="Review Length vs Predicted Sentiment"
+        title=title,
+        render_mode="webgl" if len(plot_df) > SCATTER_WEBGL_THRESHOLD else "svg",
     )
     fig.update_traces(marker=dict(size=8, opacity=0.7))
     return fig
 
+def _plot_length_density(plot_df):
+    # Review counts per (sentiment, length bin): at most 3 x SCATTER_LENGTH_BINS cells
+    lengths = plot_df["Review Length"].to_numpy(dtype=float)
+    edges = np.histogram_bin_edges(lengths, bins=SCATTER_LENGTH_BINS) if len(lengths) else np.arange(2)
+    centers = (edges[:-1] + edges[1:]) / 2
+    bins = np.clip(np.digitize(lengths, edges) - 1, 0, len(centers) - 1)
+    counts = (
+        pd.crosstab(plot_df["Predicted Sentiment"].to_numpy(), bins)
+        .reindex(columns=range(len(centers)), fill_value=0)
+    )
+
+    fig = go.Figure(data=go.Heatmap(
+        z=counts.to_numpy(),
+        x=centers,
+        y=counts.index,
+        colorscale="Blues",
+        hovertemplate="Length ≈ %{x:.0f}<br>Sentiment: %{y}<br>Reviews: %{z}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=f"Review Length vs Predicted Sentiment ({len(plot_df):,} reviews, binned)",
+        xaxis_title="Review Length",
+        yaxis_title="Predicted Sentiment",
+    )
+    return fig
+
 # HEATMAP: Sentiment vs Rating
 # def plot_sentiment_rating_heatmap(df, filtered_sentiment=None):
 #     if filtered_sentiment:
@@ -106,6 +201,7 @@ def plot_sentiment_scatter(df, filtered_sentiment=None):
 import plotly.express as px
 import pandas as pd
 
+@profiling.timed("figure.plot_attribute_score_analysis")
 def plot_attribute_score_analysis(model_name, avg_scores, review_count, avg_length):
     # Drop unwanted attributes
     avg_scores = avg_scores.drop(labels=[col for col in ['rating', 'vehicle_type'] if col in avg_scores.index])
@@ -149,6 +245,41 @@ def plot_attribute_score_analysis(model_name, avg_scores, review_count, avg_leng
     return fig
 
 
+@profiling.timed("figure.plot_attribute_mentions")
+def plot_attribute_mentions(model_name, frequencies, review_count, max_terms=15):
+    # Share of a model's reviews mentioning each attribute term (utils.mentions)
+    frequencies = frequencies.head(max_terms)
+    df = pd.DataFrame({
+        "Attribute": frequencies.index,
+        "Share": frequencies.values * 100
+    })
+
+    fig = px.bar(
+        df,
+        x="Attribute",
+        y="Share",
+        color_discrete_sequence=px.colors.qualitative.Set2,
+        title=f"💬 Attributes Mentioned in {review_count} Reviews of {model_name}",
+        labels={"Share": "Reviews Mentioning (%)"},
+    )
+
+    fig.update_layout(
+        xaxis_title="Attributes",
+        yaxis_title="Reviews Mentioning (%)",
+        yaxis=dict(range=[0, 100]),
+        font=dict(color="black", size=14),
+        title_font=dict(color="black", size=18),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        margin=dict(t=60, b=120)
+    )
+
+    fig.update_traces(marker_line_color='black', marker_line_width=1)
+
+    return fig
+
+
+@profiling.timed("figure.plot_sentiment_comparison_bar")
 def plot_sentiment_comparison_bar(sentiment_scores: dict):
     sentiment_df = pd.DataFrame({
         "Model": list(sentiment_scores.keys()),
@@ -0,0 +1,80 @@
+# wordfreq.py
+# Word-cloud token counts keyed by (Vehicle_Type, Model_Name, Predicted Sentiment,
+# Token), built once per data version (see ReviewData.token_counts). A word cloud
+# for any filter is then a lookup plus WordCloud.generate_from_frequencies instead
+# of joining and re-tokenizing every review on each rerun.
+#
+# Tokens follow WordCloud.process_text: the same regex, trailing 's and pure
+# numbers dropped, stopwords removed. Case folding and plural merging are applied
+# per selection in word_frequencies, since they depend on which rows are summed.
+# Counts are additive, so the table for newly ingested reviews merges in directly.
+from collections import defaultdict
+import pandas as pd
+
+TOKEN_PATTERN = r"\w[\w']*"
+
+# Words kept per cloud (WordCloud's own max_words default)
+MAX_WORDS = 200
+
+KEY_LEVELS = ["Vehicle_Type", "Model_Name", "Predicted Sentiment"]
+
+
+def get_stopwords():
+    from wordcloud import STOPWORDS
+
+    return {word.lower() for word in STOPWORDS}
+
+
+def token_counts(df, vehicle_type):
+    # Token counts of one review frame (with Predicted Sentiment) under vehicle_type
+    df = df.dropna(subset=["Review", "Model_Name", "Predicted Sentiment"])
+    tokens = df["Review"].astype(str).str.findall(TOKEN_PATTERN).explode().dropna()
+    tokens = tokens.str.replace(r"'[sS]$", "", regex=True)
+    tokens = tokens[~tokens.str.isdigit() & ~tokens.str.lower().isin(get_stopwords())]
+
+    keys = [
+        pd.Series(vehicle_type, index=tokens.index),
+        df["Model_Name"].astype(str).reindex(tokens.index),
+        df["Predicted Sentiment"].astype(str).reindex(tokens.index),
+        tokens.rename("Token"),
+    ]
+    counts = tokens.groupby(keys).size()
+    counts.index.names = KEY_LEVELS + ["Token"]
+    return counts.rename("Count")
+
+
+def build_token_counts(frames):
+    # frames: {vehicle_type: review frame}
+    parts = [token_counts(df, vehicle_type) for vehicle_type, df in frames.items()]
+    return pd.concat(parts).groupby(level=list(range(4))).sum().sort_index()
+
+
+def merge_token_counts(counts, other):
+    # Table over the union of both review sets
+    return counts.add(other, fill_value=0).astype("int64").sort_index()
+
+
+def word_frequencies(counts, vehicle_type, model_name=None, sentiment=None, max_words=MAX_WORDS):
+    # {word: count} for one selection (None = all models / all sentiments), with
+    # cases and plurals folded as WordCloud.process_tokens does
+    if vehicle_type not in counts.index.get_level_values(0):
+        return {}
+    selected = counts.xs(vehicle_type, level="Vehicle_Type")
+    if model_name is not None:
+        selected = selected[selected.index.get_level_values("Model_Name") == model_name]
+    if sentiment is not None:
+        selected = selected[selected.index.get_level_values("Predicted Sentiment") == sentiment]
+    selected = selected.groupby(level="Token").sum()
+
+    cases = defaultdict(dict)
+    for token, count in selected.items():
+        cases[token.lower()][token] = count
+    for key in list(cases):
+        if key.endswith("s") and not key.endswith("ss") and key[:-1] in cases:
+            singular = cases[key[:-1]]
+            for word, count in cases.pop(key).items():
+                singular[word[:-1]] = singular.get(word[:-1], 0) + count
+
+    frequencies = {max(case_counts, key=case_counts.get): sum(case_counts.values()) for case_counts in cases.values()}
+    top = sorted(frequencies.items(), key=lambda item: item[1], reverse=True)[:max_words]
+    return dict(top)